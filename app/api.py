@@ -1,28 +1,101 @@
 # app/api.py
-from fastapi import FastAPI, HTTPException
+import asyncio
+import base64
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Literal, Optional
 
 from config import get_settings
-from src import QueryOrchestrator
+from src import (
+    AsyncDynamicBatchLLMClient,
+    GroqClient,
+    LLMFallbackManager,
+    PipelineResult,
+    QueryOrchestrator,
+    fetch_chart_png,
+    get_orchestrator,
+)
 
 # Retrieve configuration
 settings = get_settings()
 
+# WARNING by default: per-request INFO/DEBUG logs (SQL, token usage) are opt-in via LOG_LEVEL
+logging.basicConfig(level=settings.LOG_LEVEL.upper())
+logger = logging.getLogger(__name__)
+
+PreviewFormat = Literal["text", "arrow", "json", "records"]
+
+
+# Build the query orchestrator once at startup and release its resources on shutdown.
+# Keeps it in memory for performance rather than creating per request;
+# get_orchestrator() makes it the single instance for the whole process
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the fallback LLM up front so the first Groq outage does not pay its load cost.
+    # Startup still succeeds without it (the orchestrator then builds its own).
+    try:
+        fallback_llm = LLMFallbackManager()
+    except Exception as e:
+        logger.warning("Fallback LLM unavailable at startup: %s", e)
+        fallback_llm = None
+
+    # Optional: coalesce concurrent Groq calls from request threads onto this event loop
+    llm_client = None
+    if settings.LLM_DYNAMIC_BATCH:
+        try:
+            llm_client = AsyncDynamicBatchLLMClient(
+                GroqClient(),
+                max_batch_size=settings.LLM_BATCH_SIZE,
+                batch_wait_timeout_s=settings.LLM_BATCH_WAIT_MS / 1000,
+            )
+            await llm_client.start()
+        except Exception as e:
+            logger.warning("Dynamic LLM batching disabled: %s", e)
+            llm_client = None
+
+    orchestrator = get_orchestrator(fallback_llm=fallback_llm, llm_client=llm_client)
+
+    # Warm the DB connection pool before serving traffic
+    # (the orchestrator already built the schema text and keeps it current)
+    await asyncio.to_thread(orchestrator.db_connector.test_connection)
+
+    app.state.orchestrator = orchestrator
+    # Shared by /query and /batch to stay within the Groq rate limits
+    app.state.llm_semaphore = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY)
+    yield
+
+    if llm_client is not None:
+        await llm_client.stop()
+    await orchestrator.aclose()
+    await asyncio.to_thread(orchestrator.close)
+    orchestrator.db_connector.engine.dispose()
+
+
 # Initialize FastAPI app with title/version/description from settings
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
     description="LLM → SQL → DB → Visualization pipeline for telecom data",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
-# Initialize the query orchestrator once to handle incoming queries
-# Keeps it in memory for performance rather than creating per request
-orchestrator = QueryOrchestrator()
-
-# Request model: only requires a 'question' string from user
+# Request model: requires a 'question' string from user
+# preview_format selects how df_preview is serialized:
+#   text (default, for Streamlit), arrow (base64 Arrow IPC stream), json (orient="split"),
+#   records (JSON list of row objects, first rows only)
 class QueryRequest(BaseModel):
     question: str
+    preview_format: PreviewFormat = "text"
+
+# Batch request model: several questions answered in one round-trip
+class BatchRequest(BaseModel):
+    questions: List[str]
+    preview_format: PreviewFormat = "text"
 
 # Response model: captures SQL, chart info, and optional messages
 class QueryResponse(BaseModel):
@@ -34,18 +107,46 @@ class QueryResponse(BaseModel):
     chart_type: Optional[str]
     chart_title: Optional[str]
     message: Optional[str] = None
+    chart_png_b64: Optional[str] = None   # PNG fetched server-side; clients fall back to chart_url
 
 
-# POST endpoint to submit a query
-# Returns SQL, data preview, chart info, and messages
-@app.post("/query", response_model=QueryResponse)
-def query(req: QueryRequest) -> QueryResponse:
+# Run one question through the pipeline
+# Repeat questions are answered from the orchestrator's result cache (keyed by schema version)
+async def _run_question(
+    request: Request, question: str, preview_format: PreviewFormat, nocache: bool
+) -> PipelineResult:
+    orchestrator: QueryOrchestrator = request.app.state.orchestrator
+
+    # Cache hits do not wait for an LLM slot
+    result = None if nocache else orchestrator.cached_result(question, preview_format)
+    if result is not None:
+        return result
+
+    # LLM call is awaited on the event loop; only the DB/chart steps use a worker thread
+    async with request.app.state.llm_semaphore:
+        return await orchestrator.run_async(question, preview_format, use_cache=not nocache)
+
+
+# Fetch the chart image once on the server (cached per chart config)
+# Bounded by CHART_PNG_TIMEOUT_SECONDS: a slow or failing QuickChart degrades to None
+# (clients fall back to chart_url); a fetch that finishes late still warms the cache
+async def _chart_png_b64(result: PipelineResult) -> Optional[str]:
+    if result.chart_spec is None or not result.chart_payload.get("url"):
+        return None
     try:
-        # Run the pipeline with the user's question
-        result = orchestrator.run(req.question)
+        png = await asyncio.wait_for(
+            asyncio.to_thread(fetch_chart_png, result.chart_payload.get("config", {})),
+            timeout=settings.CHART_PNG_TIMEOUT_SECONDS,
+        )
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        logger.info("Chart PNG skipped: %r", e)
+        return None
+    return base64.b64encode(png).decode("ascii") if png else None
 
+
+# Convert a PipelineResult into the API response model
+# Data is produced by the server, so validation is skipped (model_construct)
+def _to_response(result: PipelineResult, chart_png_b64: Optional[str] = None) -> QueryResponse:
     # Extract chart info if available
     chart_url = result.chart_payload.get("url")
     chart_config = result.chart_payload.get("config", {})
@@ -61,7 +162,7 @@ def query(req: QueryRequest) -> QueryResponse:
     message = chart_config.get("message") if isinstance(chart_config, dict) else None
 
     # Return all relevant info in a structured response
-    return QueryResponse(
+    return QueryResponse.model_construct(
         question=result.user_question,
         sql=result.sql_clean,
         df_preview=result.df_preview,
@@ -70,11 +171,73 @@ def query(req: QueryRequest) -> QueryResponse:
         chart_type=chart_type,
         chart_title=chart_title,
         message=message,
+        chart_png_b64=chart_png_b64,
     )
 
 
+# POST endpoint to submit a query
+# Returns SQL, data preview, chart info, and messages
+# Pass ?nocache=1 to bypass the result cache
+# response_model documents the schema; the response itself is serialized directly with orjson
+@app.post("/query", response_model=QueryResponse, response_class=ORJSONResponse)
+async def query(req: QueryRequest, request: Request, nocache: bool = False) -> ORJSONResponse:
+    try:
+        result = await _run_question(request, req.question, req.preview_format, nocache)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    response = _to_response(result, await _chart_png_b64(result))
+    return ORJSONResponse(response.model_dump(mode="json"))
+
+
+# POST endpoint to submit several questions at once
+# Questions share LLM calls (QueryOrchestrator.run_batch: up to 10 questions per call)
+# and then run concurrently; one failing question does not fail the batch,
+# its entry carries the error in 'message' instead
+@app.post("/batch", response_model=List[QueryResponse], response_class=ORJSONResponse)
+async def batch(req: BatchRequest, request: Request, nocache: bool = False) -> ORJSONResponse:
+    orchestrator: QueryOrchestrator = request.app.state.orchestrator
+    try:
+        async with request.app.state.llm_semaphore:
+            results = await asyncio.to_thread(
+                orchestrator.run_batch,
+                req.questions,
+                req.preview_format,
+                use_cache=not nocache,
+                return_exceptions=True,
+            )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Chart PNGs for all successful questions are fetched concurrently
+    pngs = await asyncio.gather(
+        *(_chart_png_b64(r) for r in results if not isinstance(r, Exception)),
+        return_exceptions=True,
+    )
+    png_iter = iter(pngs)
+
+    responses = []
+    for question, result in zip(req.questions, results):
+        if isinstance(result, Exception):
+            responses.append(
+                QueryResponse.model_construct(
+                    question=question,
+                    sql="",
+                    df_preview="",
+                    chart_url=None,
+                    chart_config={},
+                    chart_type=None,
+                    chart_title=None,
+                    message=str(result),
+                )
+            )
+        else:
+            png = next(png_iter)
+            responses.append(_to_response(result, None if isinstance(png, BaseException) else png))
+    return ORJSONResponse([r.model_dump(mode="json") for r in responses])
+
+
 # Simple health check endpoint for monitoring
 # Can be used by Docker/K8s or load balancers
 @app.get("/health")
 def health():
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
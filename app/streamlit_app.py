@@ -2,16 +2,41 @@
 # Streamlit frontend for telecom LLM-powered query system.
 # Calls FastAPI backend to generate SQL, execute it, and render charts.
 
+import base64
+
 import requests
 import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from config import get_settings
 
-# Load configuration
-settings = get_settings()
-
 # Prefer BACKEND_URL (inside Docker), fallback to API_URL, then localhost
-API_URL = settings.BACKEND_URL or settings.API_URL or "http://localhost:8000"
+# Settings are resolved on use (and cached by get_settings), not at import
+def get_api_url() -> str:
+    settings = get_settings()
+    return settings.BACKEND_URL or settings.API_URL or "http://localhost:8000"
+
+
+# Seconds to wait for the backend (LLM + DB + chart can take a while)
+REQUEST_TIMEOUT = 60
+
+
+# One pooled HTTP session reused across clicks and script reruns (keep-alive connections).
+# Only connection failures are retried; a slow answer is never re-sent.
+@st.cache_resource
+def get_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(total=2, read=0, backoff_factor=0.2, allowed_methods=None),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"Connection": "keep-alive"})
+    return session
+
 
 # Streamlit page config
 st.set_page_config(page_title="Telecom LLM Query UI", layout="wide")
@@ -39,7 +64,9 @@ question = st.text_input(
 if st.button("Run query") and question:
     try:
         with st.spinner("Contacting backend..."):
-            resp = requests.post(f"{API_URL}/query", json={"question": question})
+            resp = get_session().post(
+                f"{get_api_url()}/query", json={"question": question}, timeout=REQUEST_TIMEOUT
+            )
 
         if resp.status_code != 200:
             st.error(f"Backend error: {resp.status_code} - {resp.text}")
@@ -66,7 +93,11 @@ if st.button("Run query") and question:
             if message:
                 st.warning(message)
 
-            if chart_url:
+            # Prefer the PNG the backend already fetched; fall back to the QuickChart URL
+            chart_png_b64 = payload.get("chart_png_b64")
+            if chart_png_b64:
+                st.image(base64.b64decode(chart_png_b64), caption=chart_title, use_column_width=True)
+            elif chart_url:
                 st.image(chart_url, caption=chart_title, use_column_width=True)
             else:
                 st.info("No chart generated for this query.")
@@ -1,16 +1,28 @@
 # config/settings.py
+from functools import lru_cache
+
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     # App info
     APP_NAME: str 
     APP_VERSION: str
+    LOG_LEVEL: str = "WARNING"
     # LLM API (Groq / OpenAI)
     GROQ_API_KEY: str
     GROQ_MODEL_NAME: str
     GROQ_API_ENDPOINT: str
     GROQ_MAX_TOKENS: int 
     GROQ_TEMPERATURE: float 
+    LLM_MAX_CONCURRENCY: int = 8
+    LLM_TIMEOUT_SECONDS: float = 20.0
+    LLM_MAX_RETRIES: int = 3
+    LLM_MAX_PROMPT_CHARS: int = 24000
+    PROMPT_COMPACT_SCHEMA: bool = False
+    LLM_DYNAMIC_BATCH: bool = False
+    LLM_BATCH_SIZE: int = 32
+    LLM_BATCH_WAIT_MS: float = 2.0
+    NON_DATA_GATE: bool = True
 
     # PostgreSQL Database
     POSTGRES_HOST: str
@@ -18,17 +30,26 @@ class Settings(BaseSettings):
     POSTGRES_DB: str
     POSTGRES_USER: str
     POSTGRES_PASSWORD: str
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 15
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_CONNECTORX_READS: bool = False
 
     # Backend URL that Streamlit will call
     API_URL: str 
     BACKEND_URL: str
 
+    # Pipeline result cache (QueryOrchestrator)
+    QUERY_CACHE_TTL_SECONDS: int = 3600
+    # Server-side chart PNG fetch (FastAPI backend)
+    CHART_PNG_TIMEOUT_SECONDS: float = 1.5
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
 
-# Singleton instance
-settings = Settings()
-
+# Singleton: .env is read and validated on first call, not at import time
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
-    return settings
\ No newline at end of file
+    return Settings()
\ No newline at end of file
@@ -0,0 +1,30 @@
+# scripts/_common.py
+# Shared setup for the helper scripts: the schema context and the Groq client are
+# built once per process and reused by every script/function that asks for them.
+
+from functools import lru_cache
+from typing import Tuple
+
+from config import get_settings
+from src import ContextRetriever, GroqClient
+
+SCHEMA_PATH = "config/schema_metadata.json"
+
+
+@lru_cache(maxsize=1)
+def get_retriever() -> ContextRetriever:
+    """Schema metadata access (JSON parsed once)."""
+    return ContextRetriever(schema_json_path=SCHEMA_PATH)
+
+
+@lru_cache(maxsize=1)
+def get_context() -> Tuple[ContextRetriever, str, GroqClient]:
+    """
+    (retriever, full schema text, Groq client) for prompt-building scripts.
+    The Groq client keeps its HTTP connection pool for the life of the process and
+    carries the schema, so only the user question changes between prompts.
+    """
+    retriever = get_retriever()
+    schema_text = retriever.generate_schema_text(retriever.get_table_names())
+    groq_client = GroqClient(model=get_settings().GROQ_MODEL_NAME, schema_text=schema_text)
+    return retriever, schema_text, groq_client
@@ -2,8 +2,17 @@
 # Script to run a batch of test queries through the LLM → SQL → DB → Visualization pipeline.
 # Useful for QA, regression testing, and checking edge cases.
 
-from collections import defaultdict
-from src import QueryOrchestrator
+import argparse
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from enum import IntEnum
+
+import numpy as np
+
+from src import QueryOrchestrator, get_orchestrator
+
+# Maximum number of questions in flight at once (caps concurrent Groq calls)
+MAX_CONCURRENCY = 8
 
 
 # -------------------------
@@ -58,17 +67,32 @@ TEST_QUERIES = {
 }
 
 
+# -------------------------
+# Result statuses (int codes so the summary is a single bincount)
+# -------------------------
+class Status(IntEnum):
+    OK = 0
+    DB_ERROR = 1          # SQL execution failed
+    VIZ_ERROR = 2         # visualization failed
+    EMPTY_DATA = 3        # query ran but returned empty result
+    NON_DATA = 4          # rule 0: non-data informational question
+    EXCEPTION = 5         # pipeline raised
+
+
+# Prefix of the chart 'message' → status
+MESSAGE_PREFIXES = (
+    ("Query execution failed:", Status.DB_ERROR),
+    ("Visualization failed:", Status.VIZ_ERROR),
+)
+
+
 # -------------------------
 # Classify pipeline result into categories for reporting
 # -------------------------
-def classify_result(result) -> str:
+def classify_result(result) -> Status:
     """
-    Classify the pipeline output into:
-      - ok
-      - db_error (SQL execution failed)
-      - viz_error (visualization failed)
-      - empty_data (query ran but returned empty result)
-      - non_data (rule 0: non-data informational question)
+    Classify the pipeline output into a Status
+    (ok / db_error / viz_error / empty_data / non_data).
     Uses only PipelineResult fields; does NOT modify pipeline logic.
     """
     df_preview = result.df_preview
@@ -78,66 +102,161 @@ def classify_result(result) -> str:
 
     # Non-data question (rule 0)
     if isinstance(df_preview, str) and df_preview.startswith("Non-data question:"):
-        return "non_data"
+        return Status.NON_DATA
 
-    # Execution error
-    if isinstance(message, str) and message.startswith("Query execution failed:"):
-        return "db_error"
-
-    # Visualization error
-    if isinstance(message, str) and message.startswith("Visualization failed:"):
-        return "viz_error"
+    # Execution / visualization error
+    if isinstance(message, str) and message:
+        status = next((st for prefix, st in MESSAGE_PREFIXES if message.startswith(prefix)), None)
+        if status is not None:
+            return status
 
     # Empty DataFrame
     if df_preview == "Empty DataFrame":
-        return "empty_data"
+        return Status.EMPTY_DATA
 
     # Otherwise assume ok
-    return "ok"
+    return Status.OK
+
+
+# -------------------------
+# Concurrent runner
+# -------------------------
+def all_jobs():
+    """[(group_name, question), ...] in TEST_QUERIES order"""
+    return [(group_name, q) for group_name, questions in TEST_QUERIES.items() for q in questions]
+
+
+async def run_all(orchestrator: QueryOrchestrator, concurrency: int = MAX_CONCURRENCY, jobs=None):
+    """
+    Run test questions concurrently, bounded by a semaphore (all of TEST_QUERIES by default).
+    Returns [((group_name, question), result_or_exception), ...] in job order.
+    """
+    sem = asyncio.Semaphore(concurrency)
+
+    async def run_one(question: str):
+        async with sem:
+            return await orchestrator.run_async(question)
+
+    jobs = all_jobs() if jobs is None else jobs
+    results = await asyncio.gather(*(run_one(q) for _, q in jobs), return_exceptions=True)
+    return list(zip(jobs, results))
+
+
+def run_all_batched(jobs=None):
+    """
+    Run test questions through QueryOrchestrator.run_batch (several questions per LLM call).
+    Returns [((group_name, question), result_or_exception), ...] in job order.
+    """
+    jobs = all_jobs() if jobs is None else jobs
+    results = get_orchestrator().run_batch([q for _, q in jobs], return_exceptions=True)
+    return list(zip(jobs, results))
+
+
+async def run_all_and_close(jobs=None):
+    """
+    run_all on the process orchestrator inside one asyncio.run, closing the
+    orchestrator's async LLM client before that event loop ends.
+    """
+    orchestrator = get_orchestrator()
+    try:
+        return await run_all(orchestrator, jobs=jobs)
+    finally:
+        await orchestrator.aclose()
+
+
+# -------------------------
+# Multi-process runner (optional, --processes N)
+# Each worker builds its orchestrator (schema, DB pool, LLM client) once and
+# runs its shard of questions concurrently; CPU-bound parsing/validation/
+# DataFrame work then runs in parallel instead of sharing one GIL.
+# Every shard gets its own event loop (asyncio.run), so the async LLM client
+# is closed at the end of each shard and re-created for the next one.
+# -------------------------
+def _init_worker():
+    get_orchestrator()
+
+
+def _run_shard(jobs):
+    return asyncio.run(run_all_and_close(jobs))
+
+
+def run_all_processes(processes: int, shard_size: int = 16):
+    jobs = all_jobs()
+    shards = [jobs[i:i + shard_size] for i in range(0, len(jobs), shard_size)]
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker) as pool:
+        return [item for shard in pool.map(_run_shard, shards) for item in shard]
 
 
 # -------------------------
 # Main runner
 # -------------------------
 def main():
-    orchestrator = QueryOrchestrator()
-    summary_counts = defaultdict(int)
+    parser = argparse.ArgumentParser(description="Run the batch of test queries")
+    parser.add_argument(
+        "--processes", type=int, default=1,
+        help="Worker processes (1 = single process, questions run concurrently in threads)",
+    )
+    parser.add_argument(
+        "--llm-batch", action="store_true",
+        help="Answer up to 10 questions per LLM call (QueryOrchestrator.run_batch); single process",
+    )
+    args = parser.parse_args()
+
+    if args.llm_batch:
+        results = run_all_batched()
+    elif args.processes > 1:
+        results = run_all_processes(args.processes)
+    else:
+        results = asyncio.run(run_all_and_close())
+
+    statuses = []
     detailed_results = []
 
-    # Iterate over test queries grouped by category
-    for group_name, questions in TEST_QUERIES.items():
-        print(f"\n=== Group: {group_name} ===")
-        for q in questions:
-            print(f"\n▶ Question: {q}")
-            result = orchestrator.run(q)
-            status = classify_result(result)
-            summary_counts[status] += 1
-
-            # Print reduced info for manual inspection
-            print(f"Status: {status}")
-            print("SQL:")
-            print(result.sql_clean)
-            print("Preview:")
-            print(result.df_preview)
+    current_group = None
+    for (group_name, q), result in results:
+        if group_name != current_group:
+            print(f"\n=== Group: {group_name} ===")
+            current_group = group_name
 
+        print(f"\n▶ Question: {q}")
+        if isinstance(result, Exception):
+            statuses.append(Status.EXCEPTION)
+            print("Status: exception")
+            print(f"Error: {result}")
             detailed_results.append(
-                {
-                    "group": group_name,
-                    "question": q,
-                    "status": status,
-                    "sql": result.sql_clean,
-                    "df_preview": result.df_preview,
-                    "message": result.chart_payload.get("config", {}).get("message", "")
-                    if isinstance(result.chart_payload, dict)
-                    else "",
-                }
+                {"group": group_name, "question": q, "status": "exception", "message": str(result)}
             )
+            continue
 
-    # Print summary counts for all categories
-    print("\n\n===== SUMMARY =====")
-    for status, count in summary_counts.items():
-        print(f"{status}: {count}")
+        status = classify_result(result)
+        statuses.append(status)
+
+        # Print reduced info for manual inspection
+        print(f"Status: {status.name.lower()}")
+        print("SQL:")
+        print(result.sql_clean)
+        print("Preview:")
+        print(result.df_preview)
 
+        detailed_results.append(
+            {
+                "group": group_name,
+                "question": q,
+                "status": status.name.lower(),
+                "sql": result.sql_clean,
+                "df_preview": result.df_preview,
+                "message": result.chart_payload.get("config", {}).get("message", "")
+                if isinstance(result.chart_payload, dict)
+                else "",
+            }
+        )
+
+    # Print summary counts for all categories that occurred
+    counts = np.bincount(np.fromiter(statuses, dtype=np.int8, count=len(statuses)), minlength=len(Status))
+    print("\n\n===== SUMMARY =====")
+    for status in Status:
+        if counts[status]:
+            print(f"{status.name.lower()}: {counts[status]}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
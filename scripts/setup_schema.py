@@ -1,7 +1,11 @@
 import os
 import argparse
+import logging
 from src import SchemaManager
 
+# Show SchemaManager progress (tables created / upserted)
+logging.basicConfig(level=logging.INFO)
+
 # -------------------------
 # Command-line arguments
 # -------------------------
@@ -4,7 +4,8 @@
 # Also tests sample query execution and scalar queries for basic validation
 
 import sys
-from src import ContextRetriever, DBConnector, QueryExecutor
+from src import QueryExecutor, get_connector
+from _common import get_retriever
 
 
 def main():
@@ -12,7 +13,7 @@ def main():
     # Test Database Connectivity
     # -------------------------
     print("=== Database Connectivity Test ===")
-    db = DBConnector()
+    db = get_connector()
     if db.test_connection():
         print("PostgreSQL connection successful")
     else:
@@ -23,7 +24,7 @@ def main():
     # Test Schema Metadata Access
     # -------------------------
     print("\n=== Schema Metadata Test ===")
-    context = ContextRetriever()
+    context = get_retriever()
     table_names = context.get_table_names()
     print(f"Tables found ({len(table_names)}): {table_names}")
 
@@ -60,7 +61,7 @@ def main():
         df = executor.execute(sql)
         print(f"\nSample data from {table}:")
         if not df.empty:
-            print(df)
+            print(df.head().to_csv(index=False))
         else:
             print("  No rows returned or query failed.")
 
@@ -1,48 +1,42 @@
 # scripts/test_llm_query.py
 import asyncio
 import logging
+import os
 import pandas as pd
 
-from config import get_settings
-
 from src import (
-    SchemaManager,
-    ContextRetriever,
-    DBConnector,
+    get_connector,
     QueryExecutor,
-    GroqClient,
-    build_sql_prompt,
     LLMFallbackManager,
     QuerySanitizer,
     SQLValidator,
     infer_chart,
+    coerce_numeric,
     ChartSpec,
     render,
 )
+from _common import get_context
 
 
 # -------------------------------
 # Logging Setup
 # -------------------------------
-logging.basicConfig(level=logging.INFO)
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
 logger = logging.getLogger(__name__)
 
 # -------------------------------
-# Settings & Schema
+# Settings & Schema (loaded once, shared with the other scripts via _common)
 # -------------------------------
-settings = get_settings()
-context_retriever = ContextRetriever(schema_json_path="config/schema_metadata.json")
-tables = context_retriever.get_table_names()
-logger.info(f"Tables found: {tables}")
-
-# Generate textual schema for LLM prompts
-schema_text = context_retriever.generate_schema_text(tables)
+context_retriever, schema_text, groq_client = get_context()
+logger.info("Tables found: %s", context_retriever.get_table_names())
 
 # -------------------------------
 # User Question & Prompt
 # -------------------------------
 user_question = "delete all the data"
-prompt = build_sql_prompt(user_question, schema_text)
+# Static system prefix (instructions + schema) first, question last, for Groq prompt caching
+messages = groq_client.build_messages(user_question)
+prompt = messages[-1]["content"]
 logger.info("Prompt constructed for LLM.")
 
 # -------------------------------
@@ -55,31 +49,33 @@ fallback_llm = LLMFallbackManager()
 # Async main
 # -------------------------------
 async def main():
-    groq_client = GroqClient(model=settings.GROQ_MODEL_NAME)
     sql_query = None
 
     try:
         # Generate SQL via Groq API
-        sql_query = await asyncio.to_thread(groq_client.generate_sql, prompt)
+        sql_query = await groq_client.generate_sql_async(messages)
         sql_query = QuerySanitizer.sanitize(sql_query)
         validator.validate(sql_query)
-        logger.info("SQL generated (Groq API):\n%s", sql_query)
+        logger.debug("SQL generated (Groq API):\n%s", sql_query)
 
     except Exception as e:
         # Use fallback LLM for any Groq API/network errors
         logger.warning("Groq API failed, using fallback LLM: %s", e)
-        sql_query = fallback_llm.generate_sql(prompt)
-        logger.info("SQL generated (Fallback LLM):\n%s", sql_query)
+        # Runs on the fallback's own thread pool, keeping the event loop free
+        sql_query = await fallback_llm.generate_sql_async(prompt)
+        logger.debug("SQL generated (Fallback LLM):\n%s", sql_query)
 
     # -------------------------------
     # Execute SQL
     # -------------------------------
-    db = DBConnector()
+    db = get_connector()
     executor = QueryExecutor(db)
     try:
         df: pd.DataFrame = executor.execute(sql_query)
         logger.info("Query returned %d rows", len(df))
-        logger.info("\nData Preview:\n%s", df.head())
+        # Only format the preview when it will actually be logged
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("\nData Preview:\n%s", df.head().to_csv(index=False))
     except Exception as e:
         logger.error("SQL execution failed: %s", e)
         return
@@ -87,7 +83,8 @@ async def main():
     # -------------------------------
     # Infer chart type and render
     # -------------------------------
-    spec = infer_chart(df, user_question=user_question, sql_query=sql_query)
+    df = coerce_numeric(df)
+    spec = infer_chart(df, user_question=user_question, sql_query=sql_query, coerce=False)
     logger.info("Inferred chart spec: %s", spec)
 
     chart_output = render(df, spec, backend="quickchart")
@@ -97,10 +94,18 @@ async def main():
     print("\n===== SQL =====")
     print(sql_query)
     print("\n===== Data Preview =====")
-    print(df.head())
+    print(df.head().to_csv(index=False))
     print("\n===== Chart URL =====")
     print(chart_output.get("url"))
 
 
+async def main_and_close():
+    """main(), then close the Groq async client before the event loop ends"""
+    try:
+        await main()
+    finally:
+        await groq_client.aclose()
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    asyncio.run(main_and_close())
@@ -1,19 +1,21 @@
 from src.context.schema_manager import SchemaManager
 from src.context.context_retriever import ContextRetriever
 
-from src.database.db_connector import DBConnector
+from src.database.db_connector import DBConnector, get_connector
 from src.database.query_executor import QueryExecutor
 
 from src.llm.groq_client import GroqClient
-from src.llm.prompt_templates import build_sql_prompt
+from src.llm.dynamic_batch_client import AsyncDynamicBatchLLMClient
+from src.llm.prompt_templates import build_sql_prompt, build_sql_messages, build_sql_batch_messages, build_sql_system_prompt
 from src.llm.llm_fallback_manager import LLMFallbackManager
 
 from src.validation.query_sanitizer import QuerySanitizer
 from src.validation.sql_validator import SQLValidator
+from src.validation.sql_pipeline import SQLPipeline
 
-from src.visualization.chart_selector import infer_chart, ChartSpec
-from src.visualization.renderers import render
-from src.run_pipeline import QueryOrchestrator, PipelineResult
+from src.visualization.chart_selector import infer_chart, coerce_numeric, ChartSpec
+from src.visualization.renderers import render, fetch_chart_png
+from src.run_pipeline import QueryOrchestrator, PipelineResult, get_orchestrator
 
 
 
@@ -1,7 +1,37 @@
 # src/context/context_retriever.py
 import json
 import os
-from typing import List, Dict, Optional
+import re
+from typing import List, Dict, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # fall back to stdlib json
+    orjson = None
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Name parts too generic to indicate a table (e.g. 'dim', 'key', 'id')
+_STOP_WORDS = frozenset({"dim", "fact", "key", "id", "name", "type", "date", "the", "of", "by", "per", "and"})
+
+
+def _singular(word: str) -> str:
+    """Crude singular form so 'subscribers' matches 'subscriber'"""
+    return word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+
+
+def _name_terms(name: str) -> List[str]:
+    """Split a snake_case identifier into singular lowercase parts"""
+    return [_singular(part) for part in name.lower().split("_") if part]
+
+
+# Max distinct schema texts memoized per ContextRetriever
+_TEXT_CACHE_SIZE = 32
+
+# Parsed schema + tables_index per (path, mtime_ns): repeated ContextRetriever
+# constructions skip re-reading/re-parsing the JSON until the file changes
+_SCHEMA_CACHE: Dict[Tuple[str, int], Tuple[dict, Dict[str, dict]]] = {}
+
 
 class ContextRetriever:
     """
@@ -18,16 +48,69 @@ class ContextRetriever:
 
     def __init__(self, schema_json_path: str = "config/schema_metadata.json"):
         self.schema_json_path = schema_json_path
-        self.schema = self._load_schema()
-        self.tables_index = {table["table_name"]: table for table in self.schema.get("tables", [])}
+        # Per-instance memo of built schema texts (key: table tuple, or None for the summary);
+        # cleared by reload(), so it never outlives this retriever or its schema version
+        self._text_cache: Dict[Optional[Tuple[str, ...]], str] = {}
+        self.schema, self.tables_index = self._load_cached()
+        self._build_indices()
+
+    def reload(self) -> None:
+        """Re-read the schema file if it changed and invalidate the cached schema text"""
+        self.schema, self.tables_index = self._load_cached()
+        self._build_indices()
+        self._text_cache.clear()
+
+    def _load_cached(self) -> Tuple[dict, Dict[str, dict]]:
+        """Return (schema, tables_index), parsing the file only when its path/mtime is new"""
+        if not os.path.exists(self.schema_json_path):
+            raise FileNotFoundError(f"Schema metadata file not found: {self.schema_json_path}")
+        key = (os.path.abspath(self.schema_json_path), os.stat(self.schema_json_path).st_mtime_ns)
+        cached = _SCHEMA_CACHE.get(key)
+        if cached is None:
+            schema = self._load_schema()
+            tables_index = {table["table_name"]: table for table in schema.get("tables", [])}
+            # Drop entries for older versions of the same file
+            for old_key in [k for k in _SCHEMA_CACHE if k[0] == key[0]]:
+                del _SCHEMA_CACHE[old_key]
+            cached = _SCHEMA_CACHE[key] = (schema, tables_index)
+        return cached
 
     def _load_schema(self) -> dict:
         """Load JSON schema metadata"""
         if not os.path.exists(self.schema_json_path):
             raise FileNotFoundError(f"Schema metadata file not found: {self.schema_json_path}")
+        if orjson is not None:
+            with open(self.schema_json_path, "rb") as f:
+                return orjson.loads(f.read())
         with open(self.schema_json_path, "r") as f:
             return json.load(f)
 
+    def _build_indices(self) -> None:
+        """Precompute column → tables lookup and the per-table prompt text (one pass over the schema)"""
+        self._col_to_tables: Dict[str, List[str]] = {}
+        self._per_table_text: Dict[str, str] = {}
+        self._summaries: Dict[str, str] = {}           # one compact line per table
+        self._table_terms: Dict[str, frozenset] = {}   # name parts of the table and its own columns
+        for table_name, table in self.tables_index.items():
+            columns = [col["name"] for col in table.get("columns", [])]
+            for column in columns:
+                self._col_to_tables.setdefault(column, []).append(table_name)
+            fks = table.get("foreign_keys", [])
+            fk_text = ", ".join([f"{fk['column']} -> {fk['ref_table']}.{fk['ref_column']}" for fk in fks]) or "None"
+            self._summaries[table_name] = f"{table_name}({', '.join(columns)})"
+            # Foreign-key columns (e.g. subscriber_key in every fact table) would match everywhere
+            fk_columns = {fk["column"] for fk in table.get("foreign_keys", [])}
+            own_columns = [c for c in columns if c not in fk_columns]
+            self._table_terms[table_name] = frozenset(
+                part for name in [table_name, *own_columns] for part in _name_terms(name)
+            )
+            self._per_table_text[table_name] = (
+                f"Table: {table_name}\n"
+                f"Columns: {', '.join(columns)}\n"
+                f"Primary Key: {table.get('primary_key')}\n"
+                f"Foreign Keys: {fk_text}\n"
+            )
+
     def get_table_names(self) -> List[str]:
         """Return a list of all table names"""
         return list(self.tables_index.keys())
@@ -51,31 +134,45 @@ class ContextRetriever:
 
     def find_tables_by_column(self, column_name: str) -> List[str]:
         """Return tables that contain a given column"""
-        tables = []
-        for table_name, table in self.tables_index.items():
-            if any(col["name"] == column_name for col in table.get("columns", [])):
-                tables.append(table_name)
-        return tables
+        return list(self._col_to_tables.get(column_name, []))
 
     def generate_schema_text(self, table_names: Optional[List[str]] = None) -> str:
         """
         Generate a textual description of schema suitable for LLM prompts.
         If table_names is None, include all tables.
+        The text is built once per distinct table selection and memoized.
         """
-        tables_to_include = table_names or self.get_table_names()
-        schema_lines = []
-        for table_name in tables_to_include:
-            columns = self.get_columns(table_name)
-            pk = self.get_primary_key(table_name)
-            fks = self.get_foreign_keys(table_name)
-            fk_text = ", ".join([f"{fk['column']} -> {fk['ref_table']}.{fk['ref_column']}" for fk in fks]) or "None"
-            schema_lines.append(
-                f"Table: {table_name}\n"
-                f"Columns: {', '.join(columns)}\n"
-                f"Primary Key: {pk}\n"
-                f"Foreign Keys: {fk_text}\n"
-            )
-        return "\n".join(schema_lines)
+        tables_to_include = tuple(table_names or self.get_table_names())
+        text = self._text_cache.get(tables_to_include)
+        if text is None:
+            missing = [t for t in tables_to_include if t not in self._per_table_text]
+            if missing:
+                raise ValueError(f"Table '{missing[0]}' not found in schema metadata")
+            text = "\n".join(self._per_table_text[t] for t in tables_to_include)
+            if len(self._text_cache) >= _TEXT_CACHE_SIZE:
+                self._text_cache.clear()  # bounded; selections are few in practice
+            self._text_cache[tables_to_include] = text
+        return text
+
+    def generate_schema_summary(self) -> str:
+        """
+        Compact schema for LLM prompts: one 'table(col, col, ...)' line per table,
+        without PK/FK detail. Stable across questions, so it can sit in the cached prompt prefix.
+        """
+        text = self._text_cache.get(None)
+        if text is None:
+            text = self._text_cache[None] = "\n".join(self._summaries.values())
+        return text
+
+    def select_tables(self, question: str) -> List[str]:
+        """
+        Pick the tables relevant to a question by word overlap with table and column names
+        (e.g. 'churned subscribers per country' → fact_churn, dim_subscriber, dim_geography).
+        Returns tables in schema order; empty when nothing matches.
+        """
+        words = {_singular(w) for w in _WORD_RE.findall(question.lower())}
+        words -= _STOP_WORDS
+        return [table for table, terms in self._table_terms.items() if words & terms]
 
     def get_table_columns_dict(self):
         """
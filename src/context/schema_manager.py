@@ -1,4 +1,5 @@
 # src/context/schema_manager.py
+import logging
 import os
 import json
 import pandas as pd
@@ -8,9 +9,12 @@ from sqlalchemy import (
 )
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.dialects.postgresql import insert
+from pandas.api.types import (
+    is_bool_dtype, is_datetime64_any_dtype, is_float_dtype, is_integer_dtype
+)
 from config.settings import get_settings
 
-settings = get_settings()
+logger = logging.getLogger(__name__)
 
 # Map Excel/JSON types to SQLAlchemy/PostgreSQL types
 SQLALCHEMY_TYPE_MAP = {
@@ -22,6 +26,17 @@ SQLALCHEMY_TYPE_MAP = {
     "TIME": Time
 }
 
+# pandas dtype → schema type, first match wins (anything else is TEXT)
+DTYPE_CHECKERS = (
+    (is_integer_dtype, "INTEGER"),
+    (is_float_dtype, "NUMERIC"),
+    (is_bool_dtype, "BOOLEAN"),
+    (is_datetime64_any_dtype, "DATE"),
+)
+
+# Rows per executemany() call when upserting data
+UPSERT_CHUNK_ROWS = 5000
+
 
 class SchemaManager:
     """
@@ -47,21 +62,28 @@ class SchemaManager:
         self.schema_json_path = schema_json_path
         self.tables = {}  # Dictionary of table_name: DataFrame
         self.schema_metadata = {}
+        self.settings = settings = get_settings()
         self.engine = create_engine(
             f"postgresql://{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}@"
-            f"{settings.POSTGRES_HOST}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}"
+            f"{settings.POSTGRES_HOST}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}",
+            # Bulk upserts: multi-row INSERT ... VALUES pages instead of one statement per row
+            executemany_mode="values_plus_batch",
+            insertmanyvalues_page_size=1000,
         )
 
     def load_schema(self):
-        """Load Excel sheets into DataFrames"""
-        xls = pd.ExcelFile(self.excel_path)
-        for sheet_name in xls.sheet_names:
-            self.tables[sheet_name] = pd.read_excel(xls, sheet_name)
+        """Load all Excel sheets into DataFrames in one read (Rust calamine reader when installed)"""
+        try:
+            import python_calamine  # noqa: F401
+            engine = "calamine"
+        except ImportError:
+            engine = None  # pandas default (openpyxl)
+        self.tables = pd.read_excel(self.excel_path, sheet_name=None, engine=engine)
         return self.tables
 
     def generate_metadata(self):
         """Generate JSON schema metadata with automatic PK/FK detection"""
-        schema = {"database": settings.POSTGRES_DB, "dialect": "postgresql", "tables": []}
+        schema = {"database": self.settings.POSTGRES_DB, "dialect": "postgresql", "tables": []}
 
         # Track table primary keys
         table_pks = {}
@@ -72,19 +94,8 @@ class SchemaManager:
             primary_key = df.columns[0]  # Assume first column is PK
             table_pks[table_name] = primary_key
 
-            for col in df.columns:
-                dtype = df[col].dtype
-                if "int" in str(dtype):
-                    col_type = "INTEGER"
-                elif "float" in str(dtype):
-                    col_type = "NUMERIC"
-                elif "bool" in str(dtype):
-                    col_type = "BOOLEAN"
-                elif "datetime" in str(dtype):
-                    col_type = "DATE"
-                else:
-                    col_type = "TEXT"
-
+            for col, dtype in df.dtypes.items():
+                col_type = next((sql_type for check, sql_type in DTYPE_CHECKERS if check(dtype)), "TEXT")
                 columns.append({"name": col, "data_type": col_type, "nullable": False})
 
             schema["tables"].append({
@@ -94,26 +105,34 @@ class SchemaManager:
                 "foreign_keys": []  # will populate next
             })
 
-        # Second pass: infer foreign keys
+        # Reverse index: column name → [(ref_table, ref_column)] it may reference
+        # (a column matches when it exactly equals the PK of another table)
+        fk_targets = {}
+        for ref_table, ref_pk in table_pks.items():
+            fk_targets.setdefault(ref_pk, []).append((ref_table, ref_pk))
+
+        # Special case: invoice_key → billing_key
+        if "fact_billing" in table_pks:
+            fk_targets.setdefault("invoice_key", []).append(("fact_billing", "billing_key"))
+
+        # Second pass: infer foreign keys (one dict lookup per column)
         for table in schema["tables"]:
             fks = []
+            seen = set()  # (column, ref_table, ref_column) already added
             for col in table["columns"]:
                 col_name = col["name"]
                 if col_name == table["primary_key"]:
                     continue
 
-                # Match only if column exactly equals a PK of another table
-                for ref_table, ref_pk in table_pks.items():
-                    if ref_table != table["table_name"]:
-                        if col_name == ref_pk:
-                            fks.append({"column": col_name, "ref_table": ref_table, "ref_column": ref_pk})
+                for ref_table, ref_column in fk_targets.get(col_name, ()):
+                    # A PK match must point at another table; the invoice_key special case always applies
+                    if ref_table == table["table_name"] and ref_column == col_name:
+                        continue
+                    # Skip duplicate foreign keys as they are found
+                    if (col_name, ref_table, ref_column) not in seen:
+                        seen.add((col_name, ref_table, ref_column))
+                        fks.append({"column": col_name, "ref_table": ref_table, "ref_column": ref_column})
 
-                # Special case: invoice_key → billing_key
-                if col_name == "invoice_key" and "fact_billing" in table_pks:
-                    fks.append({"column": col_name, "ref_table": "fact_billing", "ref_column": "billing_key"})
-
-            # Remove duplicate foreign keys
-            fks = [dict(t) for t in {tuple(d.items()) for d in fks}]
             table["foreign_keys"] = fks
 
         self.schema_metadata = schema
@@ -153,9 +172,9 @@ class SchemaManager:
 
         try:
             metadata.create_all(self.engine)
-            print(f"PostgreSQL tables created in database {settings.POSTGRES_DB}.")
+            logger.info("PostgreSQL tables created in database %s.", self.settings.POSTGRES_DB)
         except SQLAlchemyError as e:
-            print("Error creating tables:", e)
+            logger.error("Error creating tables: %s", e)
 
     def load_data(self):
         """Insert or update data into PostgreSQL tables (UPSERT)"""
@@ -167,15 +186,20 @@ class SchemaManager:
             pk_col = list(table.primary_key.columns)[0].name
 
             df = df.drop_duplicates(subset=[pk_col])
+            # Missing values → None (SQL NULL) in one vectorized pass instead of per-row checks
+            df = df.astype(object).where(df.notna(), None)
+            records = df.to_dict(orient="records")
+
+            # One compiled UPSERT, executed with a list of parameter sets per chunk
+            stmt = insert(table)
+            update_cols = {c.name: stmt.excluded[c.name] for c in table.columns if c.name != pk_col}
+            stmt = stmt.on_conflict_do_update(index_elements=[pk_col], set_=update_cols)
 
             with self.engine.begin() as conn:
-                for _, row in df.iterrows():
-                    stmt = insert(table).values(**row.to_dict())
-                    update_cols = {c.name: stmt.excluded[c.name] for c in table.columns if c.name != pk_col}
-                    stmt = stmt.on_conflict_do_update(index_elements=[pk_col], set_=update_cols)
-                    conn.execute(stmt)
+                for start in range(0, len(records), UPSERT_CHUNK_ROWS):
+                    conn.execute(stmt, records[start:start + UPSERT_CHUNK_ROWS])
 
-            print(f"Data upserted into table: {table_name}")
+            logger.info("Data upserted into table: %s", table_name)
 
     def build(self):
         """Full pipeline: load Excel → generate metadata → save JSON → create tables → load data"""
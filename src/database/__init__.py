@@ -1,2 +1,2 @@
-from .db_connector import DBConnector
+from .db_connector import DBConnector, get_connector
 from .query_executor import QueryExecutor
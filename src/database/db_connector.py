@@ -1,30 +1,47 @@
 # src/database/db_connector.py
+import logging
+from functools import lru_cache
+
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.exc import SQLAlchemyError
 from config import get_settings
 
-settings = get_settings()  # use a consistent variable name
+logger = logging.getLogger(__name__)
 
 class DBConnector:
     """
     Manages PostgreSQL connection using SQLAlchemy.
-    Provides engine and session objects.
+    Provides engine and session objects backed by a persistent connection pool.
     """
 
     def __init__(self):
+        settings = get_settings()
+        # Plain PostgreSQL URL, shared by SQLAlchemy and the connectorx fast read path
+        self.pg_url = (
+            f"postgresql://{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}"
+            f"@{settings.POSTGRES_HOST}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}"
+        )
         # Initialize engine and session factory
         self.engine = self._create_engine()
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
 
     def _create_engine(self):
         """Create a SQLAlchemy engine using PostgreSQL connection details."""
-        url = (
-            f"postgresql://{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}"
-            f"@{settings.POSTGRES_HOST}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}"
+        settings = get_settings()
+        # Ensure search_path includes public schema.
+        # Connections are pooled and reused across queries; pre-ping (optional) drops dead
+        # connections and recycle replaces them before server-side timeouts.
+        return create_engine(
+            self.pg_url,
+            echo=False,
+            future=True,
+            connect_args={"options": "-c search_path=public"},
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
         )
-        # Ensure search_path includes public schema
-        return create_engine(url, echo=False, future=True, connect_args={"options": "-c search_path=public"})
 
     def get_session(self) -> Session:
         """Provides a new SQLAlchemy session."""
@@ -37,5 +54,11 @@ class DBConnector:
                 result = conn.execute(text("SELECT 1;"))
                 return result.scalar() == 1
         except SQLAlchemyError as e:
-            print("Database connection failed:", e)
+            logger.error("Database connection failed: %s", e)
             return False
+
+
+# Process-wide connector: one engine / connection pool shared by every caller
+@lru_cache(maxsize=1)
+def get_connector() -> DBConnector:
+    return DBConnector()
@@ -1,12 +1,34 @@
 import logging
+import re
+from functools import lru_cache
+
 import pandas as pd
 from sqlalchemy import text
+from sqlalchemy.sql.elements import TextClause
 from sqlalchemy.exc import SQLAlchemyError
+from config import get_settings
 from .db_connector import DBConnector
 
+try:
+    import connectorx as cx
+except ImportError:  # connectorx wheels are not available on every platform
+    cx = None
+
 
 logger = logging.getLogger(__name__)
 
+# Rows fetched per round-trip when streaming results through SQLAlchemy
+STREAM_CHUNK_ROWS = 10_000
+
+# A ';' followed by anything other than whitespace means a second statement
+_STMT_TAIL = re.compile(r";\s*\S")
+
+
+@lru_cache(maxsize=256)
+def _compile(sql: str) -> TextClause:
+    """Memoized text() construct per SQL string (repeated queries reuse the same clause)"""
+    return text(sql)
+
 
 class QueryExecutor:
     """
@@ -16,32 +38,65 @@ class QueryExecutor:
 
     def __init__(self, db_connector: DBConnector):
         self.db_connector = db_connector
+        # connectorx opens a fresh connection (TCP + auth) per read_sql call, bypassing the
+        # engine's pool; typical pipeline queries are small aggregates where that handshake
+        # dominates, so pooled SQLAlchemy reads are the default and connectorx is opt-in
+        self.use_connectorx = cx is not None and get_settings().DB_CONNECTORX_READS
 
     def _ensure_single_statement(self, sql: str):
         """
         Extra safety check to prevent multi-statement SQL injections.
         Even though validation occurs earlier, this ensures no accidental ';' chaining.
+        A single trailing ';' is allowed (execute strips it).
         """
-        if ";" in sql.strip():
+        if _STMT_TAIL.search(sql):
             raise ValueError("Multiple SQL statements are not allowed.")
 
+    @staticmethod
+    def _is_read_query(sql: str) -> bool:
+        head = sql.lstrip()[:6].upper()
+        return head.startswith("SELECT") or head.startswith("WITH")
+
+    def _read_arrow(self, sql: str):
+        """connectorx decodes the Postgres wire format in Rust straight into Arrow buffers (pyarrow.Table)"""
+        try:
+            return cx.read_sql(self.db_connector.pg_url, sql, return_type="arrow")
+        except Exception as e:
+            logger.error("Query execution failed: %s", e)
+            raise RuntimeError(f"Database execution failed: {e}")
+
+    def _execute_connectorx(self, sql: str) -> pd.DataFrame:
+        """Fast read path: Arrow result converted to pandas only at the edge."""
+        return self._read_arrow(sql).to_pandas(split_blocks=False, self_destruct=True)
+
     def execute(self, sql: str, params: dict = None) -> pd.DataFrame:
         params = params or {}
 
         # Only extra safety required at executor level, Safety: prevent multi-statement execution
         self._ensure_single_statement(sql)
+        sql = sql.strip().rstrip(";")
 
-        try:
-            with self.db_connector.get_session() as session:
-                result = session.execute(text(sql), params)
-                # Convert result to DataFrame for downstream analysis
-                df = pd.DataFrame(result.fetchall(), columns=result.keys())
-                return df
+        # connectorx does not support bound parameters; those queries use SQLAlchemy
+        if self.use_connectorx and not params and self._is_read_query(sql):
+            return self._execute_connectorx(sql)
 
+        try:
+            # Plain pooled connection (no ORM session) with a server-side cursor:
+            # rows arrive in chunks of STREAM_CHUNK_ROWS, so memory stays bounded
+            with self.db_connector.engine.connect().execution_options(
+                stream_results=True, yield_per=STREAM_CHUNK_ROWS
+            ) as conn:
+                result = conn.execute(_compile(sql), params)
+                columns = list(result.keys())
+                frames = [pd.DataFrame.from_records(chunk, columns=columns) for chunk in result.partitions()]
         except SQLAlchemyError as e:
             logger.error("Query execution failed: %s", e)
             raise RuntimeError(f"Database execution failed: {e}")
 
+        if not frames:
+            return pd.DataFrame(columns=columns)
+        return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True, copy=False)
+
     def execute_scalar(self, sql: str, params: dict = None):
         """
         Execute a query expected to return a single value (scalar).
@@ -50,10 +105,11 @@ class QueryExecutor:
         params = params or {}
 
         self._ensure_single_statement(sql)
+        sql = sql.strip().rstrip(";")
 
         try:
             with self.db_connector.get_session() as session:
-                result = session.execute(text(sql), params)
+                result = session.execute(_compile(sql), params)
                 return result.scalar()
 
         except SQLAlchemyError as e:
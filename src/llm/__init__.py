@@ -1,3 +1,4 @@
 
 from .groq_client import GroqClient
-from .prompt_templates import build_sql_prompt, build_few_shot_prompt
+from .dynamic_batch_client import AsyncDynamicBatchLLMClient
+from .prompt_templates import build_sql_prompt, build_sql_messages, build_sql_batch_messages, build_sql_system_prompt, build_few_shot_prompt
@@ -0,0 +1,132 @@
+# src/llm/dynamic_batch_client.py
+import asyncio
+import logging
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+from .groq_client import GroqClient
+
+logger = logging.getLogger(__name__)
+
+Prompt = Union[str, List[Dict[str, str]]]
+
+
+class AsyncDynamicBatchLLMClient:
+    """
+    Coalesces concurrent generate_sql calls into batches.
+
+    Calls arriving within `batch_wait_timeout_s` of each other (up to `max_batch_size`)
+    are dispatched together with asyncio.gather over GroqClient's native async client,
+    so they share one HTTP/2 connection pool on a single event loop instead of each
+    request holding a worker thread for the whole round-trip.
+
+    Drop-in for GroqClient in QueryOrchestrator:
+    - generate_sql(prompt): blocking, for worker threads (e.g. asyncio.to_thread)
+    - generate_sql_async(prompt): for code running on the batcher's event loop
+
+    Call start() from the event loop before use and stop() on shutdown
+    (stop() also closes the wrapped client's async connection pool).
+    """
+
+    def __init__(
+        self,
+        client: GroqClient,
+        max_batch_size: int = 32,
+        batch_wait_timeout_s: float = 0.002,
+    ):
+        self.client = client
+        self.model = client.model
+        self.max_batch_size = max_batch_size
+        self.batch_wait_timeout_s = batch_wait_timeout_s
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._inflight: Set[asyncio.Task] = set()  # keep dispatch tasks referenced until done
+
+    # ------------------------------------------------------------------ #
+    # Lifecycle
+    # ------------------------------------------------------------------ #
+    async def start(self) -> None:
+        """Start the batching loop on the running event loop."""
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop collecting batches and wait for dispatched ones to finish."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the wrapped client's async HTTP client for the running event loop."""
+        await self.client.aclose()
+
+    # ------------------------------------------------------------------ #
+    # Public API (same shape as GroqClient)
+    # ------------------------------------------------------------------ #
+    async def generate_sql_async(self, prompt: Prompt) -> str:
+        if self._queue is None:
+            raise RuntimeError("AsyncDynamicBatchLLMClient.start() has not been called")
+        future = self._loop.create_future()
+        await self._queue.put((prompt, future))
+        return await future
+
+    def generate_sql(self, prompt: Prompt) -> str:
+        """
+        Blocking call for worker threads: submits to the batcher's event loop and waits.
+        Must not be called from the event loop thread itself (use generate_sql_async there).
+        """
+        if self._loop is None:
+            raise RuntimeError("AsyncDynamicBatchLLMClient.start() has not been called")
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            raise RuntimeError("generate_sql would block the event loop; await generate_sql_async instead")
+        return asyncio.run_coroutine_threadsafe(self.generate_sql_async(prompt), self._loop).result()
+
+    # ------------------------------------------------------------------ #
+    # Batching loop
+    # ------------------------------------------------------------------ #
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            deadline = self._loop.time() + self.batch_wait_timeout_s
+
+            # Collect more calls until the window closes or the batch is full
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - self._loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Dispatch without waiting, so the next batch can start collecting immediately
+            task = asyncio.create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch: List[Tuple[Prompt, asyncio.Future]]) -> None:
+        logger.debug("Dispatching LLM batch of %d", len(batch))
+        results = await asyncio.gather(
+            *(self.client.generate_sql_async(prompt) for prompt, _ in batch),
+            return_exceptions=True,
+        )
+        for (_, future), result in zip(batch, results):
+            if future.done():  # caller gave up (cancelled)
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
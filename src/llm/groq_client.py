@@ -1,13 +1,18 @@
 # src/llm/groq_client.py
+import atexit
+import json
 import logging
+import threading
+import weakref
+from typing import Dict, List, Optional, Union
 from config import get_settings
-from groq import Groq
+from .prompt_templates import build_sql_messages
+from groq import AsyncGroq, Groq
 import asyncio
+import httpx
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
 
-settings = get_settings()
 
 class GroqClient:
     """
@@ -17,35 +22,186 @@ class GroqClient:
     - Handle API key and model settings
     - Provide synchronous or async SQL generation
     - Log success/failure for debugging
+
+    All instances share one HTTP/2 connection pool (and one Groq client per API key),
+    so TLS handshakes and keep-alive connections are reused across calls.
+
+    Each attempt is bounded by LLM_TIMEOUT_SECONDS; timeouts, connection errors,
+    429 and 5xx responses are retried by the Groq SDK up to LLM_MAX_RETRIES times with
+    jittered exponential backoff (honoring retry-after) before the error reaches
+    QueryOrchestrator, which then switches to the fallback.
+
+    generate_sql_async uses a native async client (httpx.AsyncClient), so many
+    concurrent calls share the event-loop thread instead of one worker thread each.
+    An httpx.AsyncClient is bound to the loop it first ran on, so one is kept per
+    running event loop; call `await aclose()` before that loop ends.
     """
 
-    def __init__(self, model: str = None):
+    _http_client: Optional[httpx.Client] = None
+    _clients: Dict[str, Groq] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, model: str = None, schema_text: Optional[str] = None):
+        settings = get_settings()
         self.api_key = settings.GROQ_API_KEY
         if not self.api_key:
             raise ValueError("GROQ_API_KEY not set in settings")
         self.model = model or settings.GROQ_MODEL_NAME
-        self.client = Groq(api_key=self.api_key)
+        # Output cap and sampling for every completion (SQL is short; unbounded output only adds decode time)
+        self.max_tokens = settings.GROQ_MAX_TOKENS
+        self.temperature = settings.GROQ_TEMPERATURE
+        # Optional schema injected once; build_messages() then only varies the user question
+        self.schema_text = schema_text
+        self.client = self._get_client(self.api_key)
+        # One async client per event loop (created on first async call on that loop):
+        # httpx.AsyncClient binds its pool to the loop, so a client from a closed loop
+        # (e.g. a previous asyncio.run) must never be reused
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncGroq]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    @staticmethod
+    def _request_options() -> Dict[str, object]:
+        """Timeout/retry policy shared by the sync and async clients."""
+        settings = get_settings()
+        return {
+            "timeout": httpx.Timeout(settings.LLM_TIMEOUT_SECONDS, connect=5.0),
+            "max_retries": settings.LLM_MAX_RETRIES,
+        }
+
+    @classmethod
+    def _get_client(cls, api_key: str) -> Groq:
+        """Return the process-wide Groq client for this API key, creating it on first use."""
+        with cls._lock:
+            if cls._http_client is None:
+                cls._http_client = httpx.Client(
+                    http2=True,
+                    timeout=httpx.Timeout(60.0, connect=5.0),
+                    limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+                )
+                atexit.register(cls._http_client.close)
+            client = cls._clients.get(api_key)
+            if client is None:
+                client = Groq(api_key=api_key, http_client=cls._http_client, **cls._request_options())
+                cls._clients[api_key] = client
+            return client
+
+    def _get_async_client(self) -> AsyncGroq:
+        """Return the async Groq client for the running event loop, creating it on first use."""
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            http_client = httpx.AsyncClient(
+                http2=True,
+                timeout=httpx.Timeout(60.0, connect=5.0),
+                limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+            )
+            client = AsyncGroq(api_key=self.api_key, http_client=http_client, **self._request_options())
+            self._async_clients[loop] = client
+        return client
 
-    async def _generate_sql_async(self, prompt: str) -> str:
+    async def aclose(self) -> None:
+        """Close the async client of the running event loop (no-op if none was created)."""
+        client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.close()
+
+    def build_messages(self, user_question: str) -> List[Dict[str, str]]:
         """
-        Internal async method to generate SQL via Groq.
+        Chat messages for a question against the injected schema:
+        [system: instructions + schema (identical every call)] [user: question].
+        """
+        if self.schema_text is None:
+            raise ValueError("GroqClient was created without schema_text")
+        return build_sql_messages(user_question, self.schema_text)
+
+    @staticmethod
+    def _to_messages(prompt: Union[str, List[Dict[str, str]]]) -> List[Dict[str, str]]:
+        """Accept either a plain prompt string or prebuilt chat messages."""
+        if isinstance(prompt, str):
+            return [{"role": "user", "content": prompt}]
+        return prompt
+
+    @staticmethod
+    def _log_usage(response) -> None:
+        """Log prompt token usage, including provider-side cached prompt tokens when reported."""
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = getattr(details, "cached_tokens", None) if details is not None else None
+        logger.debug("Groq prompt tokens: %s (cached: %s)", getattr(usage, "prompt_tokens", None), cached)
+
+    async def generate_sql_async(
+        self, prompt: Union[str, List[Dict[str, str]]], max_tokens: Optional[int] = None
+    ) -> str:
+        """
+        Generate SQL with a native async Groq call (no worker thread).
+        Use from async code: `await groq_client.generate_sql_async(prompt)`.
+        """
+        try:
+            response = await self._get_async_client().chat.completions.create(
+                messages=self._to_messages(prompt),
+                model=self.model,
+                max_tokens=max_tokens or self.max_tokens,
+                temperature=self.temperature,
+            )
+            sql = response.choices[0].message.content.strip()
+            logger.debug("Successfully generated SQL from Groq.")
+            self._log_usage(response)
+            return sql
+        except Exception as e:
+            logger.error(f"Groq API call failed: {e}")
+            raise
+
+    def generate_sql(
+        self, prompt: Union[str, List[Dict[str, str]]], max_tokens: Optional[int] = None
+    ) -> str:
+        """
+        Generate SQL with a blocking call on the shared sync client (no event loop is created).
+        Safe to call from worker threads (e.g. asyncio.to_thread) and plain scripts;
+        async code should await generate_sql_async instead.
+        `prompt` is either a single prompt string or a list of chat messages
+        (see build_sql_messages).
         """
         try:
             # Send prompt to Groq chat endpoint
             response = self.client.chat.completions.create(
-                messages=[{"role": "user", "content": prompt}],
-                model=self.model
+                messages=self._to_messages(prompt),
+                model=self.model,
+                max_tokens=max_tokens or self.max_tokens,
+                temperature=self.temperature,
             )
             sql = response.choices[0].message.content.strip()
-            logger.info("Successfully generated SQL from Groq.")
+            logger.debug("Successfully generated SQL from Groq.")
+            self._log_usage(response)
             return sql
         except Exception as e:
             logger.error(f"Groq API call failed: {e}")
             raise
 
-    def generate_sql(self, prompt: str) -> str:
+    def generate_sql_map(
+        self, messages: List[Dict[str, str]], max_tokens: Optional[int] = None
+    ) -> Dict[str, str]:
         """
-        Synchronous wrapper to call the async Groq API method.
-        Can be used directly in scripts without asyncio.
+        One completion answering several questions (see build_sql_batch_messages).
+        Requests JSON mode and returns {question id: SQL}.
         """
-        return asyncio.run(self._generate_sql_async(prompt))
+        try:
+            response = self.client.chat.completions.create(
+                messages=messages,
+                model=self.model,
+                max_tokens=max_tokens or self.max_tokens,
+                temperature=self.temperature,
+                response_format={"type": "json_object"},
+            )
+            self._log_usage(response)
+            data = json.loads(response.choices[0].message.content)
+        except Exception as e:
+            logger.error(f"Groq batched API call failed: {e}")
+            raise
+        if not isinstance(data, dict):
+            raise ValueError("Batched SQL response is not a JSON object")
+        return {str(key): str(sql).strip() for key, sql in data.items() if sql}
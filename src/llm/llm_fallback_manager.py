@@ -1,8 +1,16 @@
 # src/llm/llm_fallback_manager.py
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
+
+# Constant answer returned by the fallback (built once at import)
+_FALLBACK_SQL = (
+    "SELECT "
+    "'LLM offline – cannot generate SQL for this question right now. "
+    "Please try again later or contact the admin.' AS message;"
+)
 
 class LLMFallbackManager:
     """Ultra-lightweight fallback LLM.
@@ -11,9 +19,15 @@ class LLMFallbackManager:
     - QueryOrchestrator treats this as a 'message' for the UI instead of crashing.
     """
 
-    def __init__(self) -> None:
-        # No heavy initialization needed
-        pass
+    def __init__(self, max_workers: int = 2) -> None:
+        # No model to load. Async callers get a dedicated, bounded pool so fallback
+        # generation never competes with the default executor used by the rest of the app.
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-fallback")
+
+    async def generate_sql_async(self, prompt: str) -> str:
+        """Run generate_sql on the fallback's own thread pool, keeping the event loop free."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.generate_sql, prompt)
 
     def generate_sql(self, prompt: str) -> str:
         """Return a simple SQL that your pipeline can execute safely.
@@ -21,13 +35,10 @@ class LLMFallbackManager:
         handles this special case:
             SELECT '...' AS message;
         """
-        truncated_prompt = prompt[:120].replace("\n", " ")
-        logger.warning(
-            "Using fallback SQL generator (remote LLM unavailable). Prompt (truncated): %s",
-            truncated_prompt,
-        )
-        return (
-            "SELECT "
-            "'LLM offline – cannot generate SQL for this question right now. "
-            "Please try again later or contact the admin.' AS message;"
-        )
+        # Only truncate the prompt when the warning will actually be emitted
+        if logger.isEnabledFor(logging.WARNING):
+            logger.warning(
+                "Using fallback SQL generator (remote LLM unavailable). Prompt (truncated): %s",
+                prompt[:120].replace("\n", " "),
+            )
+        return _FALLBACK_SQL
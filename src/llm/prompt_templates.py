@@ -1,87 +1,139 @@
-from typing import List, Optional
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
 
-SQL_PROMPT_TEMPLATE = """
-You are a highly skilled AI that converts natural language questions into valid SQL queries for a PostgreSQL database.
- 
-Database schema — Understand it very well:
-
-{schema_text}
+# Static part of the SQL prompt: instructions, examples, then schema.
+# It is sent as the system message and must stay byte-identical across calls
+# (no timestamps, stable table order) so the provider can reuse its prompt cache.
+# The fixed rules + examples come first so they stay a cacheable prefix even when
+# the schema block differs (e.g. compact vs full schema, schema reloads).
+SQL_SYSTEM_TEMPLATE = """You convert natural language questions into valid PostgreSQL queries.
+The database schema is given after the rules and examples.
 
 Rules:
-
-0. If the user question is NOT related to measurable data (metrics, revenue, counts, averages, trends, subscribers, products, billing, or other numeric/aggregatable info),
-   OR if it contains destructive/non-SELECT operations (INSERT, UPDATE, DELETE, DROP, ALTER, TRUNCATE, CREATE, MERGE, GRANT, REVOKE, CALL, EXEC),
-   then DO NOT generate SQL.
-   Instead return exactly:
-
-   - For non-data questions:
-     SELECT 'Non-data question: ask about measurable telecom information.' AS message;
-
-   - For destructive/non-SELECT operations:
-     SELECT 'Only SELECT queries allowed. ask about measurable telecom information.' AS message;
-
-
-1. Only return valid PostgreSQL SQL that can execute without errors.
-2. Only use columns and tables that exist in the schema.
-   - NEVER invent new names.
-   - If needed columns do not exist, return the fallback in rule 0.
-3. Include JOINs only on keys that exist.
-4. Aggregate all numeric fields when grouping by a dimension.
-5. ORDER BY columns must be grouped or aggregated.
-6. Age calculation:
-   - Use only dim_subscriber.date_of_birth
-   - Cast to DATE before calculation.
-7. Aliases must be valid:
-   - Use only letters, numbers, underscores.
-   - Never use hyphens.
-8. All date-like columns must be cast to DATE when used in comparisons or calculations.
-9. For date differences:
-   AVG(CAST(paid_date AS DATE) - CAST(due_date AS DATE))
-10. Do NOT use non-PostgreSQL functions (example: DATEDIFF).
-11. Geography and churn rules:
-   - Use fact_churn joined to dim_subscriber → dim_geography.
-   - Do NOT reference tables that do not exist.
-12. Billing and payments:
-   - fact_payment: payment_amount, payment_method
-   - fact_billing: totals, statuses.
-13. Daily new subscribers:
-   - Use CAST(ds.subscription_date AS DATE)
-14. Output rules:
-   - Return ONLY SQL.
-   - No explanations.
-   - Must start with SELECT or WITH.
-15. If unsure, return fallback rule 0 exactly.
+0. If the question is not about measurable data (metrics, revenue, counts, averages, trends, subscribers, products, billing), return exactly:
+SELECT 'Non-data question: ask about measurable telecom information.' AS message;
+If it asks for a non-SELECT operation (INSERT, UPDATE, DELETE, DROP, ALTER, TRUNCATE, CREATE, MERGE, GRANT, REVOKE, CALL, EXEC), return exactly:
+SELECT 'Only SELECT queries allowed. ask about measurable telecom information.' AS message;
+1. Return only valid, executable PostgreSQL.
+2. Use only tables and columns in the schema; never invent names. If a needed column is missing, apply rule 0.
+3. JOIN only on existing keys.
+4. When grouping by a dimension, aggregate every numeric field.
+5. ORDER BY only grouped or aggregated columns.
+6. Age: use dim_subscriber.date_of_birth cast to DATE.
+7. Aliases: letters, digits, underscores only (no hyphens).
+8. Cast date-like columns to DATE in comparisons and calculations.
+9. Date differences: AVG(CAST(paid_date AS DATE) - CAST(due_date AS DATE)).
+10. No non-PostgreSQL functions (e.g. DATEDIFF).
+11. Geography/churn: fact_churn JOIN dim_subscriber JOIN dim_geography.
+12. Payments: fact_payment (payment_amount, payment_method). Billing totals/statuses: fact_billing.
+13. Daily new subscribers: CAST(ds.subscription_date AS DATE).
+14. Output only SQL starting with SELECT or WITH, no explanations.
+15. If unsure, apply rule 0.
 
 Examples:
 User: "What is the total revenue per product category last year?"
-SQL: "SELECT p.category, SUM(fb.total_charges) AS total_revenue
-FROM fact_billing fb
-JOIN dim_subscriber ds ON fb.subscriber_key = ds.subscriber_key
-JOIN dim_product p ON ds.product_key = p.product_key
-JOIN dim_time dt ON fb.time_key = dt.time_key
-WHERE dt.year = (SELECT MAX(year)-1 FROM dim_time)
-GROUP BY p.category;"
-
+SQL: SELECT p.category, SUM(fb.total_charges) AS total_revenue FROM fact_billing fb JOIN dim_subscriber ds ON fb.subscriber_key = ds.subscriber_key JOIN dim_product p ON ds.product_key = p.product_key JOIN dim_time dt ON fb.time_key = dt.time_key WHERE dt.year = (SELECT MAX(year) - 1 FROM dim_time) GROUP BY p.category;
 User: "How many subscribers signed up in 2024?"
-SQL: "SELECT COUNT(ds.subscriber_key) AS num_subscribers
-FROM dim_subscriber ds
-JOIN dim_time dt ON ds.time_key = dt.time_key
-WHERE dt.year = 2024;"
+SQL: SELECT COUNT(ds.subscriber_key) AS num_subscribers FROM dim_subscriber ds JOIN dim_time dt ON ds.time_key = dt.time_key WHERE dt.year = 2024;
+
+Database schema:
+{schema_text}
+"""
 
+# Volatile part of the SQL prompt: only the user question, always last.
+SQL_USER_TEMPLATE = """
 User question:
 {user_question}
 
 SQL:
 """
 
+SQL_PROMPT_TEMPLATE = SQL_SYSTEM_TEMPLATE + SQL_USER_TEMPLATE
+
+
+def _split_template(template: str, field: str) -> Tuple[str, str]:
+    """Split a template with exactly one {field} placeholder (and no other braces) into its literal halves"""
+    head, sep, tail = template.partition("{" + field + "}")
+    if not sep or any(c in head + tail for c in "{}"):
+        raise ValueError(f"Template must contain exactly one '{{{field}}}' and no other braces")
+    return head, tail
+
+
+# Templates pre-split at import time: building a prompt is plain concatenation,
+# with no placeholder parsing per call
+_SYSTEM_HEAD, _SYSTEM_TAIL = _split_template(SQL_SYSTEM_TEMPLATE, "schema_text")
+_USER_HEAD, _USER_TAIL = _split_template(SQL_USER_TEMPLATE, "user_question")
+
 
 def build_sql_prompt(user_question: str, schema_text: str) -> str:
     """
     Build a complete SQL-generation prompt using the main template.
     """
-    return SQL_PROMPT_TEMPLATE.format(
-        user_question=user_question.strip(),
-        schema_text=schema_text.strip()
+    return "".join((
+        _SYSTEM_HEAD, schema_text.strip(), _SYSTEM_TAIL,
+        _USER_HEAD, user_question.strip(), _USER_TAIL,
+    ))
+
+
+def build_sql_messages(
+    user_question: str, schema_text: str, schema_details: Optional[str] = None
+) -> List[Dict[str, str]]:
+    """
+    Build chat messages for SQL generation with the static instructions, schema
+    and examples first (system) and the user question last (user), so repeated
+    calls share a cacheable prompt prefix.
+    Optional per-question schema_details (e.g. PK/FK detail for matched tables)
+    go into the user message so they never break the cached prefix.
+    """
+    user_content = _USER_HEAD + user_question.strip() + _USER_TAIL
+    if schema_details:
+        user_content = f"\nRelevant table details:\n{schema_details.strip()}\n" + user_content
+    return [
+        {"role": "system", "content": build_sql_system_prompt(schema_text)},
+        {"role": "user", "content": user_content},
+    ]
+
+
+@lru_cache(maxsize=8)
+def build_sql_system_prompt(schema_text: str) -> str:
+    """
+    Static system prompt (instructions + schema + examples) for a schema text.
+    Built once per distinct schema and reused, so every call sends the identical prefix.
+    """
+    return _SYSTEM_HEAD + schema_text.strip() + _SYSTEM_TAIL
+
+
+# Batched variant of the user message: several questions answered in one completion.
+# The system prompt is unchanged, so batched calls share the cached prefix.
+_BATCH_USER_HEAD = (
+    "\nAnswer each question below separately, following the rules above.\n"
+    'Return only a JSON object mapping each question id to its SQL string, e.g. {"q1": "SELECT ..."}.\n'
+    "\nQuestions:\n"
+)
+
+
+def build_sql_batch_messages(questions: Sequence[str], schema_text: str) -> List[Dict[str, str]]:
+    """
+    Chat messages asking for SQL for several questions at once.
+    Questions are numbered q1..qN in order; the answer is a JSON object keyed by those ids.
+    """
+    lines = "\n".join(f"q{i}: {question.strip()}" for i, question in enumerate(questions, 1))
+    return [
+        {"role": "system", "content": build_sql_system_prompt(schema_text)},
+        {"role": "user", "content": _BATCH_USER_HEAD + lines + "\n"},
+    ]
+
+
+_FEW_SHOT_HEAD = "You are an expert SQL generator AI for PostgreSQL.\nDatabase schema:\n"
+
+
+@lru_cache(maxsize=32)
+def _render_examples(examples: Tuple[Tuple[str, str], ...]) -> str:
+    """Joined examples block for a tuple of (question, sql) pairs ('' when there are none)"""
+    if not examples:
+        return ""
+    return "\nFollow these examples:" + "".join(
+        f'\nUser: "{question}"\nSQL: "{sql}"' for question, sql in examples
     )
 
 
@@ -92,21 +144,13 @@ def build_few_shot_prompt(
 ) -> str:
     """
     Build a few-shot SQL prompt with optional examples.
+    The examples block is rendered once per distinct example set and reused.
     """
-    prompt_lines = [
-        "You are an expert SQL generator AI for PostgreSQL.",
-        "Database schema:",
-        schema_text.strip()
-    ]
-
-    if examples:
-        prompt_lines.append("Follow these examples:")
-        for ex in examples:
-            question = ex.get("question", "").strip()
-            sql = ex.get("sql", "").strip()
-            prompt_lines.append(f'User: "{question}"\nSQL: "{sql}"')
-
-    prompt_lines.append(f'User: "{user_question.strip()}"')
-    prompt_lines.append("SQL:")
-
-    return "\n".join(prompt_lines)
+    pairs = tuple(
+        (ex.get("question", "").strip(), ex.get("sql", "").strip()) for ex in (examples or ())
+    )
+    return (
+        f"{_FEW_SHOT_HEAD}{schema_text.strip()}"
+        f"{_render_examples(pairs)}"
+        f'\nUser: "{user_question.strip()}"\nSQL:'
+    )
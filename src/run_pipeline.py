@@ -1,19 +1,34 @@
 # src/run_pipeline.py
 
+import asyncio
+import base64
 import logging
-from dataclasses import dataclass
-from typing import Dict, Any, Optional
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Dict, Any, List, Literal, Optional, Tuple
+
+import pandas as pd
+
+from config import get_settings
 
 from src import (
     SchemaManager,
     ContextRetriever,
-    DBConnector,
+    get_connector,
     QueryExecutor,
     GroqClient,
-    build_sql_prompt,
+    build_sql_messages,
+    build_sql_batch_messages,
     SQLValidator,
     QuerySanitizer,
+    SQLPipeline,
     infer_chart,
+    coerce_numeric,
     render,
     ChartSpec,
     LLMFallbackManager,
@@ -22,7 +37,118 @@ from src import (
 
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
+
+PreviewFormat = Literal["text", "arrow", "json", "records"]
+
+# Number of rows included in machine-readable (arrow/json) previews
+PREVIEW_ROWS = 50
+# Display previews (text/records): first rows and at most this many columns
+PREVIEW_COLUMNS = 20
+
+# Successful results kept by QueryOrchestrator for exact repeat questions
+RESULT_CACHE_SIZE = 256
+
+# Questions per LLM call in QueryOrchestrator.run_batch (small batches keep JSON answers reliable)
+LLM_BATCH_QUESTIONS = 10
+
+# Local non-data gate: only questions that are nothing but small talk (greetings, thanks,
+# "who are you") get the rule-0 answer without an LLM call. Anything else, including
+# destructive requests, goes to the LLM and the Only-SELECT validation path.
+_SMALL_TALK = re.compile(
+    r"\s*(?:(?:hi|hello|hey|hiya|greetings|good\s+(?:morning|afternoon|evening|night)"
+    r"|thanks|thank\s+you|thx|ok|okay|bye|goodbye|see\s+you"
+    r"|how\s+are\s+you|who\s+are\s+you|what\s+is\s+your\s+name|what'?s\s+your\s+name"
+    r"|what\s+can\s+you\s+do)(?:\s+(?:there|again|a\s+lot|so\s+much|very\s+much))?"
+    r"[\s!.?,]*)+",
+    re.IGNORECASE,
+)
+NON_DATA_MESSAGE = "Non-data question: ask about measurable telecom information."
+
+# Error messages meaning the primary LLM is temporarily unreachable (network) or throttled
+_NETWORK_ERROR_KEYWORDS = (
+    "connection error",
+    "connection aborted",
+    "connection refused",
+    "connection reset",
+    "network is unreachable",
+    "name or service not known",
+    "temporary failure in name resolution",
+    "failed to establish a new connection",
+    "max retries exceeded",
+    "timeout",
+    "timed out",
+    "ssl",
+)
+_RATE_LIMIT_KEYWORDS = (
+    "rate limit",
+    "too many requests",
+    "status code: 429",
+    "http 429",
+)
+# One case-insensitive scan instead of a substring search per keyword
+_TRANSIENT_LLM_ERROR = re.compile(
+    "|".join(map(re.escape, _NETWORK_ERROR_KEYWORDS + _RATE_LIMIT_KEYWORDS)), re.IGNORECASE
+)
+
+
+class SingleFlight:
+    """
+    One in-flight computation per key: the first caller (leader) computes,
+    concurrent callers with the same key wait on its Future.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Any, Future] = {}
+
+    def claim(self, key: Any) -> Tuple[Future, bool]:
+        """Return (future, True) for the leader of key, or (the in-flight future, False)."""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future, False
+            future = self._calls[key] = Future()
+            return future, True
+
+    def release(
+        self, key: Any, future: Future, result: Any = None, error: Optional[BaseException] = None
+    ) -> None:
+        """Forget key, then hand the leader's result (or error) to the waiters."""
+        with self._lock:
+            self._calls.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+
+def format_preview(df: pd.DataFrame, preview_format: PreviewFormat = "text") -> str:
+    """
+    Serialize the head of a result DataFrame for the API.
+
+    - text:  CSV of the first rows and PREVIEW_COLUMNS columns (C-implemented writer, shown as text by Streamlit)
+    - arrow: base64-encoded Arrow IPC stream (decode with pyarrow.ipc.open_stream)
+    - json:  pandas orient="split" JSON
+    - records: JSON list of row objects for the same first rows/columns as text
+    """
+    if preview_format == "arrow":
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(df.head(PREVIEW_ROWS), preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return base64.b64encode(sink.getvalue().to_pybytes()).decode("ascii")
+
+    if preview_format == "json":
+        return df.head(PREVIEW_ROWS).to_json(orient="split", index=False, date_format="iso")
+
+    # Positional slice: wide results never format more than PREVIEW_COLUMNS columns
+    head = df.iloc[:5, :PREVIEW_COLUMNS]
+    if preview_format == "records":
+        return head.to_json(orient="records", date_format="iso")
+
+    return head.to_csv(index=False)
 
 
 @dataclass
@@ -30,7 +156,7 @@ class PipelineResult:
     user_question: str
     sql_raw: str
     sql_clean: str
-    df_preview: str       # df.head().to_string() or error message
+    df_preview: str       # format_preview(df, preview_format) or error message
     chart_spec: Optional[ChartSpec]
     chart_payload: Dict[str, Any]  # e.g. quickchart URL + config
 
@@ -49,12 +175,26 @@ class QueryOrchestrator:
         self,
         schema_path: str = "config/schema_metadata.json",
         llm_client: Optional[GroqClient] = None,
+        fallback_llm: Optional[LLMFallbackManager] = None,
+        compact_schema: Optional[bool] = None,
+        max_workers: int = 16,
     ):
         # Context / schema
         self.context = ContextRetriever(schema_json_path=schema_path)
+        # Compact schema: one-line table summaries + PK/FK detail only for matched tables
+        if compact_schema is None:
+            compact_schema = get_settings().PROMPT_COMPACT_SCHEMA
+        self.compact_schema = compact_schema
+        self.non_data_gate = get_settings().NON_DATA_GATE
+        # Prompt budget: larger prompts fall back to the compact schema for that question
+        self.max_prompt_chars = get_settings().LLM_MAX_PROMPT_CHARS
+        self.schema_path = schema_path
+        self._schema_lock = threading.Lock()
+        self._load_schema_text()
 
         # Fallback LLM (simple offline/placeholder)
-        self.fallback_llm = LLMFallbackManager()
+        # Built here (or passed in pre-warmed) so the first outage never pays its load cost
+        self.fallback_llm = fallback_llm or LLMFallbackManager()
 
         # Primary LLM (Groq). If it fails at init, we mark it unavailable.
         try:
@@ -71,54 +211,124 @@ class QueryOrchestrator:
         # Validator, sanitizer, DB connection, and query executor
         self.sanitizer = QuerySanitizer()
         self.validator = SQLValidator()
-        self.db_connector = DBConnector()
+        self.sql_pipeline = SQLPipeline(self.validator)  # validate + sanitize on one parse
+        self.db_connector = get_connector()
         self.executor = QueryExecutor(self.db_connector)
+        # Threads for the blocking steps of run_async (validation, DB, chart), sized for
+        # many overlapping pipelines instead of sharing asyncio's default executor
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pipeline")
+
+        # Exact-match result cache: (normalized question, schema version, preview format)
+        # → (result, expires_at); entries live QUERY_CACHE_TTL_SECONDS
+        self._result_cache: "OrderedDict[Tuple[str, int, str], Tuple[PipelineResult, float]]" = OrderedDict()
+        self._result_cache_ttl = get_settings().QUERY_CACHE_TTL_SECONDS
+        self._result_cache_lock = threading.Lock()
+        # Single-flight for concurrent duplicates: whole pipeline runs per cache key,
+        # and LLM calls per exact prompt (e.g. same question in another preview format)
+        self._inflight = SingleFlight()
+        self._llm_inflight = SingleFlight()
+
+    # ------------------------------------------------------------------ #
+    # Schema text (built once, refreshed only when the metadata file changes)
+    # ------------------------------------------------------------------ #
+    def _load_schema_text(self, mtime: Optional[float] = None) -> None:
+        self._schema_mtime = os.path.getmtime(self.schema_path) if mtime is None else mtime
+        # Part of the result-cache key: answers computed against an older schema are never reused
+        self._schema_version = getattr(self, "_schema_version", -1) + 1
+        # Prompt schema block: compact summary or full PK/FK text
+        if self.compact_schema:
+            self._schema_text = self.context.generate_schema_summary()
+        else:
+            self._schema_text = self.context.generate_schema_text()
+
+    @property
+    def schema_text(self) -> str:
+        return self._schema_text
+
+    def refresh_schema(self) -> bool:
+        """Reload the schema if its metadata file changed on disk. Returns True if it was reloaded."""
+        try:
+            if os.path.getmtime(self.schema_path) == self._schema_mtime:
+                return False
+        except OSError:
+            # File briefly missing (e.g. being rewritten): keep serving the cached schema
+            return False
+        with self._schema_lock:
+            try:
+                mtime = os.path.getmtime(self.schema_path)
+                if mtime == self._schema_mtime:
+                    return False  # another thread reloaded it
+                self.context.reload()
+            except OSError:
+                return False  # replaced since the first check: keep the cached schema
+            self._load_schema_text(mtime)
+        logger.info("Schema metadata reloaded from %s", self.schema_path)
+        return True
+
+    def _get_schema_text(self) -> str:
+        """Cached prompt schema text; one stat() per call picks up metadata file changes."""
+        self.refresh_schema()
+        return self._schema_text
+
+    # ------------------------------------------------------------------ #
+    # Lifecycle
+    # ------------------------------------------------------------------ #
+    async def aclose(self) -> None:
+        """
+        Close the LLM client's async HTTP client for the running event loop.
+        Await before that loop ends (API shutdown, end of an asyncio.run).
+        """
+        aclose = getattr(self.llm_client, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+    def close(self) -> None:
+        """
+        Shut down the worker pool used by run_async (waits for running pipeline steps).
+        A closed orchestrator is no longer returned by get_orchestrator().
+        """
+        global _orchestrator
+        with _orchestrator_lock:
+            if _orchestrator is self:
+                _orchestrator = None
+        self._pool.shutdown(wait=True)
 
     # ------------------------------------------------------------------ #
     # Helper: classify transient API errors (no internet / rate limit)
     # ------------------------------------------------------------------ #
     @staticmethod
     def _is_transient_llm_error(exc: Exception) -> bool:
-        msg = str(exc).lower()
-        network_keywords = [
-            "connection error",
-            "connection aborted",
-            "connection refused",
-            "connection reset",
-            "network is unreachable",
-            "name or service not known",
-            "temporary failure in name resolution",
-            "failed to establish a new connection",
-            "max retries exceeded",
-            "timeout",
-            "timed out",
-            "ssl",
-        ]
-        rate_limit_keywords = [
-            "rate limit",
-            "too many requests",
-            "status code: 429",
-            "http 429",
-        ]
-        if any(k in msg for k in network_keywords):
-            return True
-        if any(k in msg for k in rate_limit_keywords):
-            return True
-        return False
+        return _TRANSIENT_LLM_ERROR.search(str(exc)) is not None
 
     # ------------------------------------------------------------------ #
     # Helper: generate SQL, with primary + fallback
     # ------------------------------------------------------------------ #
-    def _generate_sql_with_fallback(self, prompt: str) -> str:
+    def _generate_sql_with_fallback(self, messages: List[Dict[str, str]]) -> str:
         """
         Generate SQL using Groq LLM; switch to fallback if primary is unavailable or transient error occurs.
+        Concurrent calls with identical messages share one LLM request.
         """
+        key = tuple(m["content"] for m in messages)
+        future, leader = self._llm_inflight.claim(key)
+        if not leader:
+            return future.result()
+        try:
+            sql = self._generate_sql_uncoalesced(messages)
+        except BaseException as e:
+            self._llm_inflight.release(key, future, error=e)
+            raise
+        self._llm_inflight.release(key, future, result=sql)
+        return sql
+
+    def _generate_sql_uncoalesced(self, messages: List[Dict[str, str]]) -> str:
+        """One primary LLM call, with fallback (see _generate_sql_with_fallback)."""
+        prompt = messages[-1]["content"]
         if not self.primary_llm_available or self.llm_client is None:
             logger.info("Primary LLM not available at init. Using fallback directly.")
             return self.fallback_llm.generate_sql(prompt)
 
         try:
-            return self.llm_client.generate_sql(prompt)
+            return self.llm_client.generate_sql(messages)
         except Exception as e:
             if self._is_transient_llm_error(e):
                 logger.error(
@@ -130,46 +340,358 @@ class QueryOrchestrator:
             logger.error("Primary LLM failed with non-transient error: %s", e)
             raise
 
+    async def _generate_sql_with_fallback_async(self, messages: List[Dict[str, str]]) -> str:
+        """
+        Awaitable variant of _generate_sql_with_fallback: uses the client's native async API
+        (GroqClient / AsyncDynamicBatchLLMClient) so no worker thread waits on the LLM round-trip.
+        Shares in-flight calls with the sync variant.
+        """
+        key = tuple(m["content"] for m in messages)
+        future, leader = self._llm_inflight.claim(key)
+        if not leader:
+            return await asyncio.wrap_future(future)
+        try:
+            sql = await self._generate_sql_uncoalesced_async(messages)
+        except BaseException as e:
+            self._llm_inflight.release(key, future, error=e)
+            raise
+        self._llm_inflight.release(key, future, result=sql)
+        return sql
+
+    async def _generate_sql_uncoalesced_async(self, messages: List[Dict[str, str]]) -> str:
+        """One primary LLM call, with fallback (see _generate_sql_with_fallback_async)."""
+        prompt = messages[-1]["content"]
+        if not self.primary_llm_available or self.llm_client is None:
+            logger.info("Primary LLM not available at init. Using fallback directly.")
+            return await self.fallback_llm.generate_sql_async(prompt)
+
+        try:
+            if hasattr(self.llm_client, "generate_sql_async"):
+                return await self.llm_client.generate_sql_async(messages)
+            return await asyncio.to_thread(self.llm_client.generate_sql, messages)
+        except Exception as e:
+            if self._is_transient_llm_error(e):
+                logger.error(
+                    "Primary LLM failed due to network / rate-limit issue. "
+                    "Switching to fallback. Error: %s",
+                    e,
+                )
+                return await self.fallback_llm.generate_sql_async(prompt)
+            logger.error("Primary LLM failed with non-transient error: %s", e)
+            raise
+
+    # ------------------------------------------------------------------ #
+    # Helper: local non-data gate (cheap check before the LLM)
+    # ------------------------------------------------------------------ #
+    def _non_data_result(self, user_question: str) -> Optional[PipelineResult]:
+        """Rule-0 answer for pure small talk (see _SMALL_TALK), or None when the LLM should decide."""
+        if not self.non_data_gate or _SMALL_TALK.fullmatch(user_question) is None:
+            return None
+        logger.info("Non-data question answered locally: %r", user_question[:80])
+        sql = f"SELECT '{NON_DATA_MESSAGE}' AS message;"
+        chart_payload = {
+            "backend": "quickchart",
+            "config": {
+                "type": "table",
+                "data": {"columns": ["message"], "rows": [[NON_DATA_MESSAGE]]},
+                "message": NON_DATA_MESSAGE,
+            },
+            "url": "",
+        }
+        return PipelineResult(
+            user_question=user_question,
+            sql_raw=sql,
+            sql_clean=sql.rstrip(";"),
+            df_preview=NON_DATA_MESSAGE,
+            chart_spec=None,
+            chart_payload=chart_payload,
+        )
+
+    # ------------------------------------------------------------------ #
+    # Helpers: result cache
+    # ------------------------------------------------------------------ #
+    def _cache_key(self, user_question: str, preview_format: PreviewFormat) -> Tuple[str, int, str]:
+        return (" ".join(user_question.lower().split()), self._schema_version, preview_format)
+
+    def _cache_get(self, key: Tuple[str, int, str], user_question: str) -> Optional[PipelineResult]:
+        with self._result_cache_lock:
+            entry = self._result_cache.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.monotonic():
+                del self._result_cache[key]  # expired entries are dropped when probed
+                return None
+            self._result_cache.move_to_end(key)
+        return self._as_answer_to(entry[0], user_question)
+
+    def cached_result(self, user_question: str, preview_format: PreviewFormat = "text") -> Optional[PipelineResult]:
+        """The cached answer for this question (current schema), or None; never runs the pipeline."""
+        self._get_schema_text()
+        return self._cache_get(self._cache_key(user_question, preview_format), user_question)
+
+    @staticmethod
+    def _as_answer_to(result: PipelineResult, user_question: str) -> PipelineResult:
+        """A shared result reported with the caller's wording of the question."""
+        if result.user_question == user_question:
+            return result
+        return replace(result, user_question=user_question)
+
+    def _settle_inflight(
+        self,
+        key: Tuple[str, int, str],
+        future: Future,
+        result: Optional[PipelineResult] = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        """Cache the result (successes only) before releasing the key, so later callers hit the cache."""
+        if result is not None:
+            self._cache_put(key, result)
+        self._inflight.release(key, future, result=result, error=error)
+
+    def _cache_put(self, key: Tuple[str, int, str], result: PipelineResult) -> None:
+        # Cache successful answers only (skip errors, messages, empty data)
+        if result.chart_spec is None:
+            return
+        entry = (result, time.monotonic() + self._result_cache_ttl)
+        with self._result_cache_lock:
+            self._result_cache[key] = entry
+            self._result_cache.move_to_end(key)
+            while len(self._result_cache) > RESULT_CACHE_SIZE:
+                self._result_cache.popitem(last=False)
+
     # ------------------------------------------------------------------ #
     # Main pipeline execution
     # ------------------------------------------------------------------ #
-    def run(self, user_question: str) -> PipelineResult:
+    def run(
+        self, user_question: str, preview_format: PreviewFormat = "text", use_cache: bool = True
+    ) -> PipelineResult:
         """
         Run the full pipeline for a single user question.
+        Repeat questions (same normalized text, schema and preview format) are served
+        from an in-process LRU without calling the LLM, the DB or QuickChart.
+
+        Args:
+            user_question: Natural-language question.
+            preview_format: Serialization of the data preview ("text", "arrow" or "json").
+            use_cache: False skips the cache lookup (the fresh result still refreshes the cache).
 
         Returns:
             PipelineResult containing SQL, DataFrame preview, chart specification, and rendered chart.
         """
+        self._get_schema_text()  # reload first if the metadata changed (also bumps the cache key)
+        key = self._cache_key(user_question, preview_format)
+        cached = self._cache_get(key, user_question) if use_cache else None
+        if cached is not None:
+            return cached
+
+        non_data = self._non_data_result(user_question)
+        if non_data is not None:
+            return non_data
+
+        # Single-flight: concurrent callers with the same key wait for the first one's result
+        future, leader = self._inflight.claim(key)
+        if not leader:
+            return self._as_answer_to(future.result(), user_question)
+        try:
+            result = self._compute(user_question, preview_format)
+        except BaseException as e:
+            self._settle_inflight(key, future, error=e)
+            raise
+        self._settle_inflight(key, future, result=result)
+        return result
 
-        # 1) Build schema text for the prompt
-        schema_text = self.context.generate_schema_text()
+    async def run_async(
+        self, user_question: str, preview_format: PreviewFormat = "text", use_cache: bool = True
+    ) -> PipelineResult:
+        """
+        Awaitable variant of run() for asyncio callers (batch runners, async endpoints).
+        The LLM call is awaited on the event loop (native async client); only the blocking
+        steps after it (validation, DB, chart) run in a worker thread, so threads are not
+        tied up for the whole LLM round-trip.
+        """
+        self._get_schema_text()  # reload first if the metadata changed (also bumps the cache key)
+        key = self._cache_key(user_question, preview_format)
+        cached = self._cache_get(key, user_question) if use_cache else None
+        if cached is not None:
+            return cached
+
+        non_data = self._non_data_result(user_question)
+        if non_data is not None:
+            return non_data
+
+        future, leader = self._inflight.claim(key)
+        if not leader:
+            return self._as_answer_to(await asyncio.wrap_future(future), user_question)
+        try:
+            result = await self._compute_async(user_question, preview_format)
+        except BaseException as e:
+            self._settle_inflight(key, future, error=e)
+            raise
+        self._settle_inflight(key, future, result=result)
+        return result
 
-        # 2) Build LLM prompt
-        prompt = build_sql_prompt(user_question=user_question, schema_text=schema_text)
+    def run_batch(
+        self,
+        questions: List[str],
+        preview_format: PreviewFormat = "text",
+        batch_size: int = LLM_BATCH_QUESTIONS,
+        use_cache: bool = True,
+        return_exceptions: bool = False,
+    ) -> List[PipelineResult]:
+        """
+        Answer several questions with one LLM call per `batch_size` questions
+        (JSON object {question id: SQL}), then validate/execute/render each one
+        independently on a thread pool. Results are returned in input order.
+
+        Cached and non-data questions skip the LLM. If a batched call fails, or its
+        answer misses a question, that question goes through run() on its own.
+        With return_exceptions=True a failing question's exception is returned in
+        its place (as asyncio.gather does) instead of failing the whole batch.
+        """
+        self._get_schema_text()
+        results: List[Any] = [None] * len(questions)
+        pending: List[int] = []
+        for i, question in enumerate(questions):
+            cached = self._cache_get(self._cache_key(question, preview_format), question) if use_cache else None
+            ready = cached or self._non_data_result(question)
+            if ready is not None:
+                results[i] = ready
+            else:
+                pending.append(i)
+
+        generate_map = getattr(self.llm_client, "generate_sql_map", None) if self.primary_llm_available else None
+
+        def finish(question: str, sql_raw: str) -> PipelineResult:
+            # The fallback LLM (on execution errors) gets this question's own single-question prompt
+            prompt = self._build_messages(question)[-1]["content"]
+            result = self._run_from_sql(question, sql_raw, prompt, preview_format)
+            self._cache_put(self._cache_key(question, preview_format), result)
+            return result
+
+        with ThreadPoolExecutor(max_workers=min(8, max(1, len(pending)))) as pool:
+            futures = {}
+            for start in range(0, len(pending), batch_size):
+                chunk = pending[start:start + batch_size]
+                sql_map: Dict[str, str] = {}
+                if generate_map is not None and len(chunk) > 1:
+                    messages = build_sql_batch_messages([questions[i] for i in chunk], self._schema_text)
+                    try:
+                        sql_map = generate_map(messages, max_tokens=self.llm_client.max_tokens * len(chunk))
+                    except Exception as e:
+                        logger.warning("Batched LLM call failed, answering questions one by one: %s", e)
+
+                # Earlier chunks execute on the pool while the next chunk's LLM call runs
+                for n, i in enumerate(chunk, 1):
+                    sql_raw = sql_map.get(f"q{n}")
+                    if sql_raw:
+                        futures[i] = pool.submit(finish, questions[i], sql_raw)
+                    else:
+                        futures[i] = pool.submit(self.run, questions[i], preview_format, use_cache)
+
+            for i, future in futures.items():
+                try:
+                    results[i] = future.result()
+                except Exception as e:
+                    if not return_exceptions:
+                        raise
+                    results[i] = e
+        return results
+
+    async def run_batch_async(
+        self, questions: List[str], preview_format: PreviewFormat = "text"
+    ) -> List[PipelineResult]:
+        """Run many questions concurrently on the event loop; results in input order."""
+        return list(await asyncio.gather(*(self.run_async(q, preview_format) for q in questions)))
+
+    def _compute(self, user_question: str, preview_format: PreviewFormat) -> PipelineResult:
+        """Uncached pipeline run (blocking)."""
+        messages = self._build_messages(user_question)
 
         # 3) Generate SQL via LLM (with fallback only on API/network/rate-limit)
         try:
-            sql_raw = self._generate_sql_with_fallback(prompt)
+            sql_raw = self._generate_sql_with_fallback(messages)
         except Exception as e:
-            msg = f"Primary LLM error (non-transient): {e}"
-            logger.error(msg)
-            chart_payload = {
-                "backend": "quickchart",
-                "config": {"type": "table", "data": {}, "message": msg},
-                "url": "",
-            }
-            return PipelineResult(
+            return self._llm_error_result(user_question, e)
+
+        return self._run_from_sql(user_question, sql_raw, messages[-1]["content"], preview_format)
+
+    async def _compute_async(self, user_question: str, preview_format: PreviewFormat) -> PipelineResult:
+        """Uncached pipeline run (LLM awaited, remaining steps in a worker thread)."""
+        messages = self._build_messages(user_question)
+
+        try:
+            sql_raw = await self._generate_sql_with_fallback_async(messages)
+        except Exception as e:
+            return self._llm_error_result(user_question, e)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._pool, self._run_from_sql, user_question, sql_raw, messages[-1]["content"], preview_format
+        )
+
+    # ------------------------------------------------------------------ #
+    # Pipeline steps
+    # ------------------------------------------------------------------ #
+    def _build_messages(self, user_question: str) -> List[Dict[str, str]]:
+        """Steps 1-2: schema context and LLM messages for a question."""
+
+        # 1) Schema text for the prompt (cached on the instance; checked at the start of run)
+        schema_text = self._schema_text
+        schema_details = None
+        if self.compact_schema:
+            selected = self.context.select_tables(user_question)
+            if selected:
+                schema_details = self.context.generate_schema_text(selected)
+
+        # 2) Build LLM messages (static system prefix first, question last for prompt caching)
+        messages = build_sql_messages(
+            user_question=user_question, schema_text=schema_text, schema_details=schema_details
+        )
+
+        prompt_chars = sum(len(m["content"]) for m in messages)
+        if prompt_chars > self.max_prompt_chars and not self.compact_schema:
+            # Over budget: one-line table summaries + full detail only for the matched tables
+            selected = self.context.select_tables(user_question)
+            messages = build_sql_messages(
                 user_question=user_question,
-                sql_raw="",
-                sql_clean="",
-                df_preview=msg,
-                chart_spec=None,
-                chart_payload=chart_payload,
+                schema_text=self.context.generate_schema_summary(),
+                schema_details=self.context.generate_schema_text(selected) if selected else None,
             )
+            logger.info(
+                "Prompt of %d chars exceeds LLM_MAX_PROMPT_CHARS=%d; using compact schema (%d chars)",
+                prompt_chars, self.max_prompt_chars, sum(len(m["content"]) for m in messages),
+            )
+        elif logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Prompt: %d chars (~%d tokens)", prompt_chars, prompt_chars // 4)
+        return messages
+
+    @staticmethod
+    def _llm_error_result(user_question: str, e: Exception) -> PipelineResult:
+        """Step 3 failure: the primary LLM raised a non-transient error."""
+        msg = f"Primary LLM error (non-transient): {e}"
+        logger.error(msg)
+        chart_payload = {
+            "backend": "quickchart",
+            "config": {"type": "table", "data": {}, "message": msg},
+            "url": "",
+        }
+        return PipelineResult(
+            user_question=user_question,
+            sql_raw="",
+            sql_clean="",
+            df_preview=msg,
+            chart_spec=None,
+            chart_payload=chart_payload,
+        )
 
-        # 4) Validate immediately (block destructive queries)
+    def _run_from_sql(
+        self, user_question: str, sql_raw: str, prompt: str, preview_format: PreviewFormat
+    ) -> PipelineResult:
+        """Steps 4-11: validate, execute and chart the generated SQL (blocking)."""
+
+        # 4-5) Validate (block destructive queries) and sanitize, on a single parse
         try:
-            self.validator.validate(sql_raw)
+            sql_clean = self.sql_pipeline.process(sql_raw)
         except ValueError as e:
             # Return a safe SQL message instead of executing unsafe queries
             safe_sql = f"SELECT 'Only SELECT queries allowed. Detected: {str(e)}' AS message;"
@@ -191,9 +713,6 @@ class QueryOrchestrator:
                 chart_payload=chart_payload,
             )
 
-        # 5) Sanitize
-        sql_clean = self.sanitizer.sanitize(sql_raw)
-
         # 6) Execute with error handling
         try:
             df = self.executor.execute(sql_clean)
@@ -201,9 +720,9 @@ class QueryOrchestrator:
             logger.error("Query execution failed: %s", e)
             fallback_sql_raw = self.fallback_llm.generate_sql(prompt)
             sql_raw = fallback_sql_raw
-            sql_clean = self.sanitizer.sanitize(fallback_sql_raw)
+            sql_clean = fallback_sql_raw
             try:
-                self.validator.validate(sql_clean)
+                sql_clean = self.sql_pipeline.process(fallback_sql_raw)
                 df = self.executor.execute(sql_clean)
             except Exception as e2:
                 msg = f"Query execution failed: {e}. Fallback also failed: {e2}"
@@ -259,8 +778,9 @@ class QueryOrchestrator:
                 chart_payload=chart_payload,
             )
 
-        # 9) Decide chart
-        chart_spec = infer_chart(df, user_question=user_question, sql_query=sql_clean)
+        # 9) Decide chart (renderer gets the same numeric-coerced frame)
+        df = coerce_numeric(df)
+        chart_spec = infer_chart(df, user_question=user_question, sql_query=sql_clean, coerce=False)
 
         # 10) Render chart
         chart_payload = render(df, chart_spec, backend="quickchart")
@@ -270,14 +790,32 @@ class QueryOrchestrator:
             user_question=user_question,
             sql_raw=sql_raw,
             sql_clean=sql_clean,
-            df_preview=df.head().to_string(),
+            df_preview=format_preview(df, preview_format),
             chart_spec=chart_spec,
             chart_payload=chart_payload,
         )
 
+# ---------------------------------------------------------------------- #
+# Process-wide orchestrator (one DB pool, one schema cache, one LLM client)
+# ---------------------------------------------------------------------- #
+_orchestrator: Optional[QueryOrchestrator] = None
+_orchestrator_lock = threading.Lock()
+
+
+def get_orchestrator(**kwargs: Any) -> QueryOrchestrator:
+    """
+    Return the process-wide QueryOrchestrator, creating it on first call.
+    kwargs are forwarded to QueryOrchestrator(...) and only apply to that first call.
+    """
+    global _orchestrator
+    with _orchestrator_lock:
+        if _orchestrator is None:
+            _orchestrator = QueryOrchestrator(**kwargs)
+        return _orchestrator
+
 
 if __name__ == "__main__":
-    orchestrator = QueryOrchestrator()
+    orchestrator = get_orchestrator()
     question = "Average total charges per payment method"
     result = orchestrator.run(question)
 
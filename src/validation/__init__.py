@@ -1,2 +1,3 @@
 from .sql_validator import SQLValidator
 from .query_sanitizer import QuerySanitizer
+from .sql_pipeline import SQLPipeline
@@ -1,5 +1,52 @@
 import re
-import sqlparse
+from typing import Sequence
+
+from sqlparse.sql import Statement
+
+from .sql_parser import parse_statements
+
+# Body of a markdown code fence (```sql ... ``` or ``` ... ```)
+_FENCE = re.compile(r"```(?:sql)?\s*(.*?)```", re.DOTALL | re.IGNORECASE)
+# Stray fence markers (e.g. an unterminated fence)
+_FENCE_MARK = re.compile(r"```(?:sql)?", re.IGNORECASE)
+# Opening tag of a PostgreSQL dollar-quoted string ($$ or $tag$)
+_DOLLAR_TAG = re.compile(r"\$(?:[A-Za-z_][A-Za-z0-9_]*)?\$")
+
+
+def _strip_sql(sql: str) -> str:
+    """
+    Remove -- and /* */ comments in one left-to-right scan, then trailing semicolons.
+    Quoted text ('literals', "identifiers" and $$dollar-quoted$$ strings) is copied
+    untouched, so '--' or ';' inside a string survive. Kept text is sliced in runs
+    rather than per character. Semicolons elsewhere are left for the validator,
+    which rejects multiple statements.
+    """
+    out = []
+    start = i = 0
+    n = len(sql)
+    while i < n:
+        ch = sql[i]
+        if ch == "'" or ch == '"':
+            # Jump to the closing quote (a doubled '' just closes and reopens)
+            end = sql.find(ch, i + 1)
+            i = n if end == -1 else end + 1
+        elif ch == "$" and (tag := _DOLLAR_TAG.match(sql, i)):
+            # Jump past the matching closing tag
+            end = sql.find(tag.group(), tag.end())
+            i = n if end == -1 else end + len(tag.group())
+        elif ch == "-" and sql.startswith("--", i):
+            out.append(sql[start:i])
+            end = sql.find("\n", i)
+            i = start = n if end == -1 else end  # keep the newline
+        elif ch == "/" and sql.startswith("/*", i):
+            out.append(sql[start:i])
+            end = sql.find("*/", i + 2)
+            i = start = n if end == -1 else end + 2
+        else:
+            i += 1
+    out.append(sql[start:])
+    return "".join(out).strip().rstrip(";").strip()
+
 
 class QuerySanitizer:
     """
@@ -12,29 +59,33 @@ class QuerySanitizer:
     def sanitize(sql_query: str) -> str:
         if not sql_query:
             return ""
+        return QuerySanitizer.clean_statements(parse_statements(QuerySanitizer.prepare(sql_query)))
 
-        # Remove markdown fences
+    @staticmethod
+    def prepare(sql_query: str) -> str:
+        """Text-level cleanup before parsing: markdown fences and outer quotes."""
+        # Remove markdown fences: keep only the fenced body (drops any prose around it)
         sql_query = sql_query.strip()
-        sql_query = sql_query.replace("```sql", "").replace("```", "")
+        if "```" in sql_query:
+            fenced = _FENCE.search(sql_query)
+            sql_query = fenced.group(1).strip() if fenced else _FENCE_MARK.sub("", sql_query).strip()
 
         # Remove outer quotes
         if (sql_query.startswith('"') and sql_query.endswith('"')) or \
            (sql_query.startswith("'") and sql_query.endswith("'")):
             sql_query = sql_query[1:-1]
+        return sql_query
 
-        # Split into statements safely
-        statements = sqlparse.split(sql_query)
+    @staticmethod
+    def clean_statements(statements: Sequence[Statement]) -> str:
+        """Strip comments and trailing semicolons; return the first non-empty statement."""
         cleaned_statements = []
 
-        for stmt in statements:
-            # Remove inline comments
-            stmt_no_comment = re.sub(r"--.*?$", "", stmt, flags=re.MULTILINE)
-            # Remove block comments
-            stmt_no_comment = re.sub(r"/\*.*?\*/", "", stmt_no_comment, flags=re.DOTALL)
-            # Remove trailing semicolons (keep semicolons inside strings)
-            stmt_no_comment = stmt_no_comment.rstrip(";")
-            if stmt_no_comment.strip():
-                cleaned_statements.append(stmt_no_comment.strip())
+        for stmt in (str(stmt).strip() for stmt in statements):
+            # Remove comments and trailing semicolons (keeps '--' / ';' inside strings)
+            stmt_no_comment = _strip_sql(stmt)
+            if stmt_no_comment:
+                cleaned_statements.append(stmt_no_comment)
 
         # Always return the first valid statement
         return cleaned_statements[0] if cleaned_statements else ""
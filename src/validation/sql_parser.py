@@ -0,0 +1,18 @@
+# src/validation/sql_parser.py
+from functools import lru_cache
+from typing import Tuple
+
+import sqlparse
+from sqlparse.sql import Statement
+
+
+@lru_cache(maxsize=1024)
+def parse_statements(sql_query: str) -> Tuple[Statement, ...]:
+    """
+    Parse SQL text into sqlparse statements, memoized per SQL string.
+
+    The sanitizer and the validator both need the parse of the same LLM output;
+    sharing this cache means each distinct SQL string is tokenized once.
+    Returned statements must be treated as read-only.
+    """
+    return tuple(sqlparse.parse(sql_query))
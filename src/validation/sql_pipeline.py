@@ -0,0 +1,32 @@
+# src/validation/sql_pipeline.py
+from typing import Optional
+
+from .query_sanitizer import QuerySanitizer, _strip_sql
+from .sql_parser import parse_statements
+from .sql_validator import SQLValidator
+
+
+class SQLPipeline:
+    """
+    Validation + sanitization of LLM output in one pass over a single parse.
+
+    Fences/quotes are stripped first (text-level). A plain single SELECT is then
+    accepted by a keyword scan; anything else is parsed once, the validator checks
+    the parsed statements and the sanitizer cleans them.
+    """
+
+    def __init__(self, validator: Optional[SQLValidator] = None):
+        self.validator = validator or SQLValidator()
+
+    def process(self, sql_raw: str) -> str:
+        """
+        Return clean, single-statement SQL ready to execute.
+        Raises ValueError for empty, multi-statement or non-SELECT SQL.
+        """
+        sql_query = QuerySanitizer.prepare(sql_raw or "")
+        # Common case (one plain SELECT, nothing suspicious): no sqlparse tokenization at all
+        if sql_query and self.validator.is_plain_select(sql_query):
+            return _strip_sql(sql_query)
+        statements = parse_statements(sql_query)
+        self.validator.validate_statements(sql_query, statements)
+        return QuerySanitizer.clean_statements(statements)
@@ -1,4 +1,13 @@
-import sqlparse
+import re
+from typing import Sequence
+
+from sqlparse import tokens as T
+from sqlparse.sql import Statement
+
+from .sql_parser import parse_statements
+
+# First keyword after leading whitespace/comments
+_FIRST_KW = re.compile(r"(?:\s|/\*.*?\*/|--[^\n]*(?:\n|$))*([A-Za-z]+)", re.DOTALL)
 
 class SQLValidator:
     """
@@ -14,11 +23,33 @@ class SQLValidator:
         "GRANT", "REVOKE", "CALL", "EXEC"
     }
 
+    # Any forbidden word anywhere in the text (strings and comments included)
+    _FORBIDDEN_WORD = re.compile(r"\b(?:" + "|".join(sorted(FORBIDDEN)) + r")\b", re.IGNORECASE)
+
+    def is_plain_select(self, sql_query: str) -> bool:
+        """
+        Fast check, no tokenizer: True when the query starts with SELECT/WITH,
+        has no ';' before its end and mentions no forbidden keyword at all.
+        False means "undecided" (not "unsafe"); the sqlparse checks must decide.
+        """
+        match = _FIRST_KW.match(sql_query)
+        if not match or match.group(1).upper() not in ("SELECT", "WITH"):
+            return False
+        if ";" in sql_query.rstrip().rstrip(";"):
+            return False
+        return self._FORBIDDEN_WORD.search(sql_query) is None
+
     def validate(self, sql_query: str) -> bool:
         if not sql_query:
             raise ValueError("Empty SQL query")
+        if self.is_plain_select(sql_query):
+            return True
+        return self.validate_statements(sql_query, parse_statements(sql_query))
 
-        statements = sqlparse.parse(sql_query)
+    def validate_statements(self, sql_query: str, statements: Sequence[Statement]) -> bool:
+        """Validate an already-parsed query (statements = parse_statements(sql_query))."""
+        if not sql_query:
+            raise ValueError("Empty SQL query")
 
         # Multi-statement detection
         if len(statements) != 1:
@@ -39,4 +70,9 @@ class SQLValidator:
         elif stmt_type != "SELECT":
             raise ValueError(f"Statement type not allowed: {stmt_type}")
 
+        # Block DML/DDL nested anywhere in the statement (e.g. data-modifying CTEs)
+        for token in stmt.flatten():
+            if token.ttype in (T.Keyword.DML, T.Keyword.DDL) and token.normalized in self.FORBIDDEN:
+                raise ValueError(f"Only SELECT queries allowed. Detected: {token.normalized}")
+
         return True
@@ -1,2 +1,2 @@
-from .chart_selector import infer_chart, ChartSpec
-from .renderers import render
+from .chart_selector import infer_chart, coerce_numeric, ChartSpec
+from .renderers import render, fetch_chart_png
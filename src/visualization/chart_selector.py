@@ -19,26 +19,65 @@ class ChartSpec:
 
 TIME_LIKE_COLS = {"date", "usage_date", "year", "month", "billing_cycle"}
 
+# Categories up to this count are drawn as a pie, more as a bar chart
+PIE_MAX_CATEGORIES = 6
+# Rows checked before falling back to a full nunique() in _has_at_most_n_unique
+UNIQUE_PREFIX_ROWS = 1000
+
+
+def _has_at_most_n_unique(series: pd.Series, n: int) -> bool:
+    """
+    Same decision as `series.nunique() <= n`, but a column with more than n distinct
+    values in its first UNIQUE_PREFIX_ROWS rows is rejected without hashing the rest.
+    Nulls (None / NaN / pd.NA / NaT) are not counted, as in nunique().
+    """
+    prefix = series.iloc[:UNIQUE_PREFIX_ROWS]
+    if len(prefix.dropna().unique()) > n:
+        return False
+    if len(series) <= UNIQUE_PREFIX_ROWS:
+        return True
+    return series.nunique() <= n
+
+
+def coerce_numeric(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert numeric-looking columns (e.g. numeric text) to numbers.
+    Columns already typed numeric are skipped; returns a new frame and never mutates df.
+    """
+    converted = {}
+    for col in df.columns:
+        if pd.api.types.is_numeric_dtype(df[col]):
+            continue
+        try:
+            converted[col] = pd.to_numeric(df[col])
+        except (ValueError, TypeError):
+            pass  # genuinely non-numeric column
+    return df.assign(**converted) if converted else df
+
+
 def infer_chart(
     df: pd.DataFrame,
     user_question: str | None = None,
-    sql_query: str | None = None
+    sql_query: str | None = None,
+    coerce: bool = True,
 ) -> ChartSpec:
 
-    # FIX: Convert numeric text columns to numeric
-    for col in df.columns:
-        df[col] = pd.to_numeric(df[col], errors="ignore")
+    # FIX: Convert numeric text columns to numeric (on a copy; the caller's frame is untouched)
+    # Callers that already ran coerce_numeric (to render the same frame) pass coerce=False
+    if coerce:
+        df = coerce_numeric(df)
 
-    # (all NaN) datasets → show message instead of empty chart    
-    if df.isna().all().all():
+    if df.empty or df.shape[1] == 0:
+        return ChartSpec(chart_type="table", title="No data returned")
+
+    # (all NaN) datasets → show message instead of empty chart
+    # (count() tallies non-null values per column without building a boolean frame)
+    if df.count().sum() == 0:
         return ChartSpec(
             chart_type="table",
             title="No data available for the selected query or filters"
         )
 
-    if df.empty or df.shape[1] == 0:
-        return ChartSpec(chart_type="table", title="No data returned")
-
     numeric_cols = df.select_dtypes(include=["number"]).columns.tolist()
     non_numeric_cols = df.select_dtypes(exclude=["number", "bool"]).columns.tolist()
 
@@ -61,9 +100,7 @@ def infer_chart(
     if non_numeric_cols and numeric_cols:
         cat = non_numeric_cols[0]
         metric = numeric_cols[0]
-        nunique = df[cat].nunique()
-
-        if nunique <= 6:
+        if _has_at_most_n_unique(df[cat], PIE_MAX_CATEGORIES):
             return ChartSpec(chart_type="pie", x=cat, y=[metric], title=f"Distribution of {metric} by {cat}")
         else:
             return ChartSpec(chart_type="bar", x=cat, y=[metric], title=f"{metric} by {cat}", x_label=cat, y_label=metric)
@@ -1,13 +1,43 @@
 #src/visualization/renderers.py
-from typing import Dict, Any, Literal
-import json
+import atexit
+from functools import lru_cache
+from typing import Dict, Any, Literal, Optional
+import logging
 import urllib.parse
+
+import httpx
+import orjson
 import pandas as pd
 
 from .chart_selector import ChartSpec
 
+logger = logging.getLogger(__name__)
+
 Backend = Literal["quickchart"]
 
+QUICKCHART_URL = "https://quickchart.io/chart"
+
+# Shared keep-alive HTTP/2 client for QuickChart image downloads: concurrent pipeline
+# runs reuse its connections instead of paying a TLS handshake per chart
+_http_client = httpx.Client(
+    http2=True,
+    timeout=httpx.Timeout(5.0, connect=3.0),
+    limits=httpx.Limits(max_connections=32, max_keepalive_connections=32),
+)
+atexit.register(_http_client.close)
+
+def _labels(series: pd.Series) -> list:
+    """Chart labels as strings; columns already holding strings skip the per-element str() copy."""
+    if pd.api.types.is_string_dtype(series) and not series.hasnans:
+        return series.to_numpy().tolist()
+    return series.astype(str).tolist()
+
+
+def _values(series: pd.Series) -> list:
+    """Data points as Python scalars, converted straight from the numpy array."""
+    return series.to_numpy().tolist()
+
+
 def render(df: pd.DataFrame, spec: ChartSpec, backend: Backend = "quickchart") -> Dict[str, Any]:
     """
     Render a chart from a DataFrame and a ChartSpec using the chosen backend.
@@ -44,8 +74,8 @@ def render_quickchart(df: pd.DataFrame, spec: ChartSpec) -> Dict[str, Any]:
 
     # --- LINE & BAR ---
     if spec.chart_type in ("line", "bar"):
-        labels = df[spec.x].astype(str).tolist()
-        datasets = [{"label": metric, "data": df[metric].tolist()} for metric in (spec.y or [])]
+        labels = _labels(df[spec.x])
+        datasets = [{"label": metric, "data": _values(df[metric])} for metric in (spec.y or [])]
 
         config = {
             "type": spec.chart_type,
@@ -66,9 +96,9 @@ def render_quickchart(df: pd.DataFrame, spec: ChartSpec) -> Dict[str, Any]:
 
     # --- PIE ---
     elif spec.chart_type == "pie":
-        labels = df[spec.x].astype(str).tolist()
+        labels = _labels(df[spec.x])
         metric = spec.y[0]
-        data = df[metric].tolist()
+        data = _values(df[metric])
 
         config = {
             "type": "pie",
@@ -85,7 +115,7 @@ def render_quickchart(df: pd.DataFrame, spec: ChartSpec) -> Dict[str, Any]:
         config = {
             "type": "bar",
             "data": {
-                "labels": counts.index.astype(str).tolist(),
+                "labels": _labels(counts.index.to_series()),
                 "datasets": [{"label": "Count", "data": counts.values.tolist()}],
             },
             "options": {
@@ -99,7 +129,10 @@ def render_quickchart(df: pd.DataFrame, spec: ChartSpec) -> Dict[str, Any]:
     elif spec.chart_type == "scatter":
         x = spec.x
         y = spec.y[0]
-        data = [{"x": float(df.iloc[i][x]), "y": float(df.iloc[i][y])} for i in range(len(df))]
+        # Whole columns as float arrays; tolist() converts to Python floats in C
+        xs = df[x].to_numpy(dtype=float).tolist()
+        ys = df[y].to_numpy(dtype=float).tolist()
+        data = [{"x": a, "y": b} for a, b in zip(xs, ys)]
         config = {
             "type": "scatter",
             "data": {"datasets": [{"label": f"{y} vs {x}", "data": data}]},
@@ -116,12 +149,50 @@ def render_quickchart(df: pd.DataFrame, spec: ChartSpec) -> Dict[str, Any]:
     else:  
         config = {"type": "table", "data": {}}
 
-    # Encode configuration as URL for QuickChart.io
-    encoded = urllib.parse.quote(json.dumps(config))
-    url = f"https://quickchart.io/chart?c={encoded}"
+    # Encode configuration as URL for QuickChart.io (memoized per serialized config)
+    url = _quickchart_url(_config_key(config))
 
     return {
         "backend": "quickchart",
         "config": config,
         "url": url,
     }
+
+
+def _config_key(config: Dict[str, Any]) -> bytes:
+    """Canonical serialized form of a chart config (stable key ordering), used as cache key."""
+    return orjson.dumps(config, option=orjson.OPT_SORT_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+@lru_cache(maxsize=2048)
+def _quickchart_url(config_json: bytes) -> str:
+    """Build the QuickChart GET URL for a serialized config (memoized: identical charts skip URL-encoding)."""
+    return f"{QUICKCHART_URL}?c={urllib.parse.quote_from_bytes(config_json)}"
+
+
+@lru_cache(maxsize=512)
+def _fetch_quickchart_png(config_json: bytes) -> bytes:
+    """Download the PNG for a serialized chart config (memoized per config; failures are not cached)."""
+    response = _http_client.post(
+        QUICKCHART_URL,
+        content=b'{"format":"png","chart":' + config_json + b"}",
+        headers={"Content-Type": "application/json"},
+    )
+    response.raise_for_status()
+    return response.content
+
+
+def fetch_chart_png(config: Dict[str, Any]) -> Optional[bytes]:
+    """
+    Fetch the rendered chart image server-side so clients don't need a round-trip to QuickChart.
+
+    Identical configs are served from an in-process cache. Returns None for
+    table fallbacks or when QuickChart is unreachable (clients can still use the URL).
+    """
+    if not config or config.get("type") == "table":
+        return None
+    try:
+        return _fetch_quickchart_png(_config_key(config))
+    except httpx.HTTPError as e:
+        logger.warning("QuickChart image download failed: %s", e)
+        return None
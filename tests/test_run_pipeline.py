@@ -0,0 +1,149 @@
+# tests/test_run_pipeline.py
+# Runs with: python -m unittest discover -s tests   (from the repository root)
+# The LLM clients and the database are replaced with in-memory fakes.
+
+import asyncio
+import os
+import re
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+# Settings without a .env file (values are never used to connect anywhere)
+for _name, _value in {
+    "APP_NAME": "test", "APP_VERSION": "0", "GROQ_API_KEY": "test", "GROQ_MODEL_NAME": "test",
+    "GROQ_API_ENDPOINT": "http://localhost", "GROQ_MAX_TOKENS": "256", "GROQ_TEMPERATURE": "0",
+    "POSTGRES_HOST": "localhost", "POSTGRES_PORT": "5432", "POSTGRES_DB": "test",
+    "POSTGRES_USER": "test", "POSTGRES_PASSWORD": "test", "API_URL": "http://localhost",
+    "BACKEND_URL": "http://localhost",
+}.items():
+    os.environ.setdefault(_name, _value)
+
+from src import run_pipeline  # noqa: E402
+from src.run_pipeline import QueryOrchestrator  # noqa: E402
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), "..", "config", "schema_metadata.json")
+SQL = "SELECT payment_method, AVG(total_charges) AS avg_charges FROM customers GROUP BY payment_method"
+
+
+class FakeLLM:
+    """Async LLM client that answers every prompt with SQL after a short delay."""
+
+    model = "fake"
+    max_tokens = 256
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def generate_sql_async(self, messages):
+        self.calls += 1
+        await asyncio.sleep(0.05)  # long enough for concurrent callers to coalesce
+        return SQL
+
+    def generate_sql(self, messages):
+        self.calls += 1
+        return SQL
+
+    def generate_sql_map(self, messages, max_tokens=None):
+        self.calls += 1
+        count = len(re.findall(r"^q\d+:", messages[-1]["content"], re.MULTILINE))
+        return {f"q{n}": SQL for n in range(1, count + 1)}
+
+
+class FakeFallback:
+    def generate_sql(self, prompt):
+        raise AssertionError("fallback LLM should not be used")
+
+    async def generate_sql_async(self, prompt):
+        raise AssertionError("fallback LLM should not be used")
+
+
+def make_orchestrator(llm: FakeLLM) -> QueryOrchestrator:
+    df = pd.DataFrame({"payment_method": ["card", "cash"], "avg_charges": [10.5, 7.25]})
+    with mock.patch.object(run_pipeline, "get_connector"), \
+            mock.patch.object(run_pipeline, "QueryExecutor") as executor_cls:
+        executor_cls.return_value.execute.return_value = df
+        return QueryOrchestrator(schema_path=SCHEMA_PATH, llm_client=llm, fallback_llm=FakeFallback())
+
+
+class RunAsyncCoalescingTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.llm = FakeLLM()
+        self.orchestrator = make_orchestrator(self.llm)
+        self.addCleanup(self.orchestrator._pool.shutdown)
+
+    def test_same_question_in_two_preview_formats_shares_one_llm_call(self):
+        question = "Average total charges per payment method"
+
+        async def both():
+            return await asyncio.gather(
+                self.orchestrator.run_async(question, "text"),
+                self.orchestrator.run_async(question, "json"),
+            )
+
+        text_result, json_result = asyncio.run(both())
+
+        self.assertEqual(self.llm.calls, 1)
+        for result in (text_result, json_result):
+            self.assertIsNotNone(result.chart_spec, result.df_preview)
+            self.assertEqual(result.sql_raw, SQL)
+        self.assertTrue(json_result.df_preview.startswith("{"))
+        self.assertFalse(text_result.df_preview.startswith("{"))
+
+    def test_coalesced_callers_get_their_own_wording(self):
+        questions = ["Average total charges per payment method", "average  TOTAL charges per payment method"]
+
+        async def both():
+            return await asyncio.gather(*(self.orchestrator.run_async(q) for q in questions))
+
+        results = asyncio.run(both())
+
+        self.assertEqual(self.llm.calls, 1)
+        self.assertEqual([r.user_question for r in results], questions)
+
+
+class RunBatchTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.llm = FakeLLM()
+        self.orchestrator = make_orchestrator(self.llm)
+        self.addCleanup(self.orchestrator._pool.shutdown)
+
+    def test_one_llm_call_and_single_question_fallback_prompts(self):
+        questions = ["Average total charges per payment method", "Total revenue by sales channel"]
+        with mock.patch.object(
+            self.orchestrator, "_run_from_sql", wraps=self.orchestrator._run_from_sql
+        ) as run_from_sql:
+            results = self.orchestrator.run_batch(questions)
+
+        self.assertEqual(self.llm.calls, 1)
+        self.assertEqual([r.user_question for r in results], questions)
+        prompts = {c.args[0]: c.args[2] for c in run_from_sql.call_args_list}
+        for question in questions:
+            self.assertEqual(prompts[question], self.orchestrator._build_messages(question)[-1]["content"])
+
+
+class NonDataGateTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.orchestrator = make_orchestrator(FakeLLM())
+        self.addCleanup(self.orchestrator._pool.shutdown)
+
+    def test_small_talk_is_answered_locally(self):
+        for question in ("hello", "Hi there!", "thanks a lot", "Good morning, how are you?"):
+            result = self.orchestrator._non_data_result(question)
+            self.assertIsNotNone(result, question)
+            self.assertEqual(result.df_preview, run_pipeline.NON_DATA_MESSAGE)
+
+    def test_data_and_destructive_questions_go_to_the_llm(self):
+        for question in (
+            "customers in Cairo",
+            "what's the ARPU?",
+            "hello, how many customers churned?",
+            "drop everything",
+            "truncate all tables",
+        ):
+            self.assertIsNone(self.orchestrator._non_data_result(question), question)
+
+
+if __name__ == "__main__":
+    unittest.main()
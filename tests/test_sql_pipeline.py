@@ -0,0 +1,30 @@
+# tests/test_sql_pipeline.py
+import unittest
+
+from src.validation.query_sanitizer import _strip_sql
+from src.validation.sql_pipeline import SQLPipeline
+
+
+class StripSqlTest(unittest.TestCase):
+    def test_only_trailing_semicolons_are_removed(self):
+        self.assertEqual(_strip_sql("SELECT 1 ; "), "SELECT 1")
+        self.assertEqual(_strip_sql("SELECT 1; -- done"), "SELECT 1")
+        self.assertEqual(_strip_sql("SELECT 1; SELECT 2"), "SELECT 1; SELECT 2")
+
+    def test_quoted_text_is_kept(self):
+        self.assertEqual(_strip_sql("SELECT 'a;--b' AS v;"), "SELECT 'a;--b' AS v")
+        self.assertEqual(_strip_sql("SELECT $$a;b$$;"), "SELECT $$a;b$$")
+        self.assertEqual(_strip_sql("SELECT $t$ /* x */ $t$ AS v"), "SELECT $t$ /* x */ $t$ AS v")
+
+
+class SQLPipelineTest(unittest.TestCase):
+    def test_multiple_statements_are_rejected(self):
+        with self.assertRaises(ValueError):
+            SQLPipeline().process("SELECT 1; DROP TABLE customers")
+
+    def test_dollar_quoted_literal_is_unchanged(self):
+        self.assertEqual(SQLPipeline().process("SELECT $$a;b$$ AS v;"), "SELECT $$a;b$$ AS v")
+
+
+if __name__ == "__main__":
+    unittest.main()